@@ -0,0 +1,141 @@
+# arrow.py - 箭矢定义
+# -*- coding: utf-8 -*-
+import pygame
+import random
+import numpy as np
+from constants import *
+
+
+def draw_arrow(surface):
+    """绘制箭矢"""
+    arrow_width = surface.get_width()
+    arrow_height = surface.get_height()
+
+    # 清空表面
+    surface.fill((0, 0, 0, 0))
+
+    # 箭矢颜色
+    ARROW_SHAFT = (139, 69, 19)  # 棕色箭杆
+    ARROW_HEAD = (105, 105, 105)  # 灰色箭头
+    ARROW_FEATHER = (255, 0, 0)   # 红色羽毛
+
+    # 绘制箭杆（矩形）
+    shaft_rect = pygame.Rect(
+        arrow_width // 2 - 2,
+        5,
+        4,
+        arrow_height - 15
+    )
+    pygame.draw.rect(surface, ARROW_SHAFT, shaft_rect)
+
+    # 绘制箭头（三角形）
+    head_points = [
+        (arrow_width // 2, 0),  # 顶端
+        (arrow_width // 2 - 5, 10),  # 左下
+        (arrow_width // 2 + 5, 10)   # 右下
+    ]
+    pygame.draw.polygon(surface, ARROW_HEAD, head_points)
+
+    # 绘制羽毛（底部的小三角形）
+    feather_points = [
+        (arrow_width // 2, arrow_height),  # 底端
+        (arrow_width // 2 - 4, arrow_height - 10),  # 左上
+        (arrow_width // 2 + 4, arrow_height - 10)   # 右上
+    ]
+    pygame.draw.polygon(surface, ARROW_FEATHER, feather_points)
+
+
+class ArrowField:
+    """用 NumPy 数组（结构数组形式）保存所有箭矢的位置和速度，统一移动、回收和检测碰撞"""
+
+    def __init__(self, capacity=ARROW_FIELD_CAPACITY):
+        # 箭矢尺寸
+        self.arrow_width = ARROW_WIDTH
+        self.arrow_height = ARROW_HEIGHT
+
+        # 所有箭矢共用一张图像
+        self.image = pygame.Surface((self.arrow_width, self.arrow_height), pygame.SRCALPHA)
+        draw_arrow(self.image)
+        if pygame.display.get_surface() is not None:
+            self.image = self.image.convert_alpha()
+
+        # 前 count 个元素是有效的箭矢
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.speed = np.zeros(capacity, dtype=np.float64)
+        self.previous_y = np.zeros(capacity, dtype=np.int64)  # 上一次更新前的位置，绘制插值用
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, rng=random):
+        """在 (x, y) 生成一支随机下落速度的箭矢"""
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.previous_y[i] = y
+        self.speed[i] = rng.uniform(3, 7)  # 随机下落速度
+        self.count += 1
+
+    def grow(self):
+        """容量不足时扩大一倍"""
+        capacity = len(self.x) * 2
+        for name in ('x', 'y', 'speed', 'previous_y'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        """更新箭矢状态 - 向下移动，移出屏幕底部的箭矢被回收"""
+        n = self.count
+        if n == 0:
+            return
+        y = self.y[:n]
+        self.previous_y[:n] = y
+
+        # 与 pygame.Rect 对小数坐标的处理一致：四舍五入（远离零）
+        moved = y + self.speed[:n]
+        y[:] = np.sign(moved) * np.floor(np.abs(moved) + 0.5)
+
+        # 如果箭矢移出屏幕底部，则删除（保持剩余箭矢的顺序）
+        keep = y <= SCREEN_HEIGHT
+        if not keep.all():
+            kept = int(keep.sum())
+            for array in (self.x, self.y, self.speed, self.previous_y):
+                array[:kept] = array[:n][keep]
+            self.count = kept
+
+    def collides(self, rect):
+        """检测是否有箭矢与矩形相交"""
+        n = self.count
+        if n == 0:
+            return False
+        x = self.x[:n]
+        y = self.y[:n]
+        hit = ((x < rect.right) & (x + self.arrow_width > rect.left) &
+               (y < rect.bottom) & (y + self.arrow_height > rect.top))
+        return bool(hit.any())
+
+    def visible_blits(self, view, offset_x, offset_y, alpha=1.0):
+        """返回视野内箭矢的 (图像, 屏幕坐标) 列表，按 alpha 在两次更新之间插值"""
+        n = self.count
+        if n == 0:
+            return []
+        x = self.x[:n]
+        y = self.y[:n]
+        visible = ((x < view.right) & (x + self.arrow_width > view.left) &
+                   (y < view.bottom) & (y + self.arrow_height > view.top))
+        if not visible.any():
+            return []
+        previous_y = self.previous_y[:n][visible]
+        screen_x = x[visible] - offset_x
+        screen_y = previous_y + (y[visible] - previous_y) * alpha - offset_y
+        image = self.image
+        return [(image, position) for position in zip(screen_x.tolist(), screen_y.tolist())]
@@ -0,0 +1,125 @@
+# batch_runner.py - 用进程池并行运行大量无窗口游戏模拟，统计存活高度和死因
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 每局结果以 JSON 行输出到标准输出，不能混入 pygame 导入时打印的欢迎信息（子进程继承这个环境变量）
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from bot_policies import POLICIES
+
+
+def run_simulation(seed, policy_name, max_frames):
+    """在当前进程中运行一局无窗口模拟，返回这一局的结果"""
+    from game import Game
+
+    start = time.perf_counter()
+    game = Game(headless=True, seed=seed)
+    policy = POLICIES[policy_name]()
+    rng = random.Random(seed)  # 策略自己的随机数，不影响游戏本身的随机序列
+
+    best_y = game.player.rect.y
+    frames = 0
+    while frames < max_frames and not game.game_over:
+        game.step(1, policy(game, rng))
+        frames += 1
+        best_y = min(best_y, game.player.rect.y)
+
+    return {
+        'seed': seed,
+        'policy': policy_name,
+        'frames': frames,
+        'max_height': game.base_height - best_y,
+        'score': game.score,
+        'cause': game.death_cause if game.game_over else 'timeout',
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def run_batch(seeds, policy_names, max_frames, workers=None):
+    """把 (种子, 策略) 的所有组合分发到进程池，按完成顺序逐个产出结果"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_simulation, seed, policy_name, max_frames)
+                   for policy_name in policy_names for seed in seeds]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class BatchStats:
+    """汇总批量模拟的吞吐量和每种策略的结果"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.runs = 0
+        self.frames = 0
+        self.heights = defaultdict(list)  # 策略 -> 每局最大高度
+        self.causes = defaultdict(Counter)  # 策略 -> 死因计数
+
+    def add(self, result):
+        self.runs += 1
+        self.frames += result['frames']
+        self.heights[result['policy']].append(result['max_height'])
+        self.causes[result['policy']][result['cause']] += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        policies = {}
+        for policy, heights in self.heights.items():
+            heights = sorted(heights)
+            policies[policy] = {
+                'runs': len(heights),
+                'mean_height': sum(heights) / len(heights),
+                'median_height': heights[len(heights) // 2],
+                'max_height': heights[-1],
+                'causes': dict(self.causes[policy]),
+            }
+        return {
+            'runs': self.runs,
+            'frames': self.frames,
+            'seconds': elapsed,
+            'runs_per_second': self.runs / max(elapsed, 1e-9),
+            'frames_per_second': self.frames / max(elapsed, 1e-9),
+            'policies': policies,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行运行大量无窗口游戏模拟")
+    parser.add_argument("--runs", type=int, default=100, help="每种策略运行的局数")
+    parser.add_argument("--seed-base", type=int, default=0, help="第一局的种子，之后依次加一")
+    parser.add_argument("--policies", default="climber", help="逗号分隔的策略名：" + ",".join(POLICIES))
+    parser.add_argument("--max-frames", type=int, default=3600, help="每局最多模拟的帧数")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument("--output", default=None, help="逐局结果写入的JSON Lines文件")
+    args = parser.parse_args()
+
+    policy_names = args.policies.split(",")
+    for name in policy_names:
+        if name not in POLICIES:
+            parser.error(f"未知策略: {name}")
+    seeds = range(args.seed_base, args.seed_base + args.runs)
+
+    stats = BatchStats()
+    output = open(args.output, "w") if args.output else None
+    try:
+        for result in run_batch(seeds, policy_names, args.max_frames, args.workers):
+            stats.add(result)
+            line = json.dumps(result, ensure_ascii=False)
+            if output:
+                output.write(line + "\n")
+            else:
+                print(line)
+    finally:
+        if output:
+            output.close()
+
+    print(json.dumps(stats.summary(), ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
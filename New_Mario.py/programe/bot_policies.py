@@ -0,0 +1,95 @@
+# bot_policies.py - 自动操作玩家的简单策略，用于批量模拟和平衡性测试
+# -*- coding: utf-8 -*-
+import pygame
+from constants import *
+from frame_input import INPUT_NONE, INPUT_LEFT, INPUT_RIGHT, INPUT_SPRINT, INPUT_JUMP
+
+
+class IdlePolicy:
+    """什么都不做"""
+
+    def __call__(self, game, rng):
+        return INPUT_NONE
+
+
+class RandomPolicy:
+    """随机左右移动和跳跃"""
+
+    def __call__(self, game, rng):
+        flags = rng.choice([INPUT_NONE, INPUT_LEFT, INPUT_RIGHT, INPUT_LEFT | INPUT_SPRINT, INPUT_RIGHT | INPUT_SPRINT])
+        if rng.random() < 0.05:
+            flags |= INPUT_JUMP
+        return flags
+
+
+def find_next_platform(game):
+    """找到玩家上方最近的一块安全平台"""
+    rect = game.player.rect
+    search = pygame.Rect(rect.centerx - SCREEN_WIDTH // 2, rect.bottom - 160, SCREEN_WIDTH, 150)
+    best = None
+    best_distance = None
+    for platform in game.platforms.collide(search):
+        if platform.platform_type == DEATH_GROUND or platform.has_spikes:
+            continue
+        if platform.rect.top >= rect.bottom - 10:
+            continue
+        distance = abs(platform.rect.centerx - rect.centerx) + (rect.bottom - platform.rect.top)
+        if best is None or distance < best_distance:
+            best = platform
+            best_distance = distance
+    return best
+
+
+class ClimberPolicy:
+    """绕到上方最近平台的侧面起跳，越过平台顶部后再向平台中心移动，下落时用二段跳补高度"""
+
+    def __init__(self):
+        self.target = None  # 当前要跳上去的平台，落地后才重新选择
+
+    def __call__(self, game, rng):
+        player = game.player
+        rect = player.rect
+
+        # 落地后速度为0且跳跃次数已重置
+        grounded = player.vel_y == 0 and player.jumps_remaining == player.max_jumps
+        if grounded or self.target is None or not self.target.alive():
+            self.target = find_next_platform(game)
+        target = self.target
+        if target is None:
+            return INPUT_NONE
+
+        flags = INPUT_NONE
+        dx = target.rect.centerx - rect.centerx
+        toward = INPUT_RIGHT if dx > 0 else INPUT_LEFT
+        away = INPUT_LEFT if dx > 0 else INPUT_RIGHT
+        under_target = rect.right > target.rect.left - 4 and rect.left < target.rect.right + 4
+        gap = max(target.rect.left - rect.right, rect.left - target.rect.right)
+
+        if rect.bottom <= target.rect.top:
+            # 已经高过平台顶部，向平台中心移动
+            if abs(dx) > 8:
+                flags |= toward
+        elif grounded:
+            if under_target:
+                flags |= away  # 先从平台正下方走出来，避免起跳时撞头
+            elif gap > 40:
+                flags |= toward
+                if gap > 150:
+                    flags |= INPUT_SPRINT
+            else:
+                flags |= INPUT_JUMP
+        elif under_target and rect.top > target.rect.bottom:
+            flags |= away  # 上升途中避开平台底部
+
+        # 下落时还没到平台高度，用二段跳
+        if player.vel_y > 0 and player.jumps_remaining > 0 and rect.bottom > target.rect.top:
+            flags |= INPUT_JUMP
+        return flags
+
+
+# 策略名 -> 策略类，每局模拟创建一个新实例
+POLICIES = {
+    'idle': IdlePolicy,
+    'random': RandomPolicy,
+    'climber': ClimberPolicy,
+}
@@ -2,14 +2,53 @@
 # -*- coding: utf-8 -*-
 import pygame
 from constants import *
+from texture_cache import TextureCache
 import sys
 
 class BrickPlatform(pygame.sprite.Sprite):
+    # 纹理缓存：(width, height, platform_type, has_spikes) -> 共享的平台表面（在类定义之后创建）
+    textures = None
+    # 尖刺地面每个尖刺的宽度，地面纹理由这个宽度的图块重复拼成
+    SPIKE_WIDTH = 15
+    
     def __init__(self, x, y, width, height, platform_type=PLATFORM, has_spikes=False, is_moving=False):
         super().__init__()
         
+        self.width = width
+        self.height = height
         self.platform_type = platform_type
         self.has_spikes = has_spikes  # 标记平台是否有尖刺
+        self.set_moving(is_moving)
+        
+        # 平台先只有位置和尺寸，进入摄像机附近时才从纹理缓存取得纹理（见 materialize）
+        # 尺寸和类型相同的平台共用同一张纹理
+        self.texture = None
+        self.rect = pygame.Rect((x, y), BrickPlatform.rect_size(width, height, platform_type))
+    
+    @property
+    def image(self):
+        """绘制时用到的纹理，还没有取得时立即取得"""
+        if self.texture is None:
+            self.materialize()
+        return self.texture
+    
+    def materialize(self):
+        """从纹理缓存取得纹理"""
+        if self.texture is None:
+            self.texture = BrickPlatform.textures.acquire(self.pool_key)
+    
+    def release_texture(self):
+        """离开摄像机附近或被回收时释放纹理，没有平台使用的纹理可以被缓存淘汰"""
+        if self.texture is not None:
+            BrickPlatform.textures.release(self.pool_key)
+            self.texture = None
+    
+    @property
+    def pool_key(self):
+        """对象池分类键：尺寸和类型相同的平台纹理相同，可以互相复用"""
+        return (self.width, self.height, self.platform_type, self.has_spikes)
+    
+    def set_moving(self, is_moving):
         self.is_moving = is_moving  # 标记平台是否移动
         
         # 移动平台参数
@@ -17,27 +56,57 @@ class BrickPlatform(pygame.sprite.Sprite):
             self.move_direction = 1  # 移动方向，1为右，-1为左
             self.move_speed = 2  # 移动速度
             self.move_range = 100  # 移动范围
-        
-        # 创建平台表面 - 对于尖刺地面，创建更大的表面以实现无限延伸效果
-        if self.platform_type == DEATH_GROUND:
-            # 为尖刺地面创建一个比实际显示区域大得多的表面
-            extended_width = width + 600  # 在左右方向各扩展300个单位，总共600个单位
-            self.image = pygame.Surface((extended_width, height), pygame.SRCALPHA)
-        else:
-            self.image = pygame.Surface((width, height), pygame.SRCALPHA)
-        
-        self.rect = self.image.get_rect()
+    
+    def reset(self, x, y, is_moving=False):
+        """从对象池取出后重新放置平台"""
         self.rect.x = x
         self.rect.y = y
+        self.set_moving(is_moving)
+    
+    @classmethod
+    def get_texture(cls, width, height, platform_type=PLATFORM, has_spikes=False):
+        """取得平台纹理但不占用，用于提前绘制，第一次用到某种平台时才绘制"""
+        return cls.textures.get((width, height, platform_type, has_spikes))
+    
+    @classmethod
+    def create_texture(cls, width, height, platform_type=PLATFORM, has_spikes=False):
+        """绘制纹理，已创建窗口时转换成显示格式，加快绘制"""
+        texture = cls.render_texture(width, height, platform_type, has_spikes)
+        if pygame.display.get_surface() is not None:
+            texture = texture.convert_alpha()
+        return texture
+    
+    @staticmethod
+    def rect_size(width, height, platform_type=PLATFORM):
+        """平台矩形（碰撞范围）的实际尺寸，尖刺地面比给定宽度多出600"""
+        if platform_type == DEATH_GROUND:
+            return (width + 600, height)
+        return (width, height)
+    
+    def floor_blit(self, view_left, offset_x, offset_y):
+        """尖刺地面的 (图像, 屏幕坐标)：纹理是覆盖一屏的尖刺条，按尖刺宽度对齐到视野左边
         
-        # 根据类型绘制不同纹理
-        if self.platform_type == DEATH_GROUND:
-            self.draw_spike_texture(extended_width, height)
+        与地面矩形的左右范围无关，摄像机走到哪里地面就画到哪里
+        """
+        x = view_left - (view_left - self.rect.x) % BrickPlatform.SPIKE_WIDTH
+        return (self.image, (x - offset_x, self.rect.y - offset_y))
+    
+    @classmethod
+    def render_texture(cls, width, height, platform_type=PLATFORM, has_spikes=False):
+        """绘制一种平台的纹理"""
+        if platform_type == DEATH_GROUND:
+            # 尖刺地面只绘制一个尖刺图块，重复拼成比屏幕宽两个尖刺的长条，绘制时按摄像机位置平移（见 floor_blit）
+            tile = pygame.Surface((cls.SPIKE_WIDTH, height), pygame.SRCALPHA)
+            cls.draw_spike_tile(tile, height)
+            surface = pygame.Surface((SCREEN_WIDTH + cls.SPIKE_WIDTH * 2, height), pygame.SRCALPHA)
+            surface.blits([(tile, (x, 0)) for x in range(0, surface.get_width(), cls.SPIKE_WIDTH)], doreturn=False)
         else:
-            if self.has_spikes:
-                self.draw_brick_with_spikes(width, height)  # 绘制带尖刺的平台
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+            if has_spikes:
+                cls.draw_brick_with_spikes(surface, width, height)  # 绘制带尖刺的平台
             else:
-                self.draw_brick_texture(width, height)
+                cls.draw_brick_texture(surface, width, height)
+        return surface
     
     def update(self, *args):
         # 更新移动平台的位置
@@ -47,8 +116,14 @@ class BrickPlatform(pygame.sprite.Sprite):
             # 检查是否到达移动边界，改变方向
             if self.rect.x <= -self.move_range or self.rect.x >= SCREEN_WIDTH - self.rect.width + self.move_range:
                 self.move_direction *= -1  # 反转移动方向
+            
+            # 通知带空间索引的精灵组更新位置
+            for group in self.groups():
+                if hasattr(group, 'relocate'):
+                    group.relocate(self)
     
-    def draw_brick_texture(self, width, height):
+    @staticmethod
+    def draw_brick_texture(surface, width, height):
         """绘制砖块纹理"""
         # 砖块颜色定义
         BRICK_RED = (178, 34, 34)  # 砖红色
@@ -56,7 +131,7 @@ class BrickPlatform(pygame.sprite.Sprite):
         BRICK_BORDER = (105, 105, 105)  # 砖块边缘灰
         
         # 填充背景
-        self.image.fill(BRICK_DARK_RED)
+        surface.fill(BRICK_DARK_RED)
         
         # 计算砖块尺寸
         brick_width = 40
@@ -75,16 +150,17 @@ class BrickPlatform(pygame.sprite.Sprite):
                 if col + offset + brick_width <= width and row + brick_height <= height:
                     # 绘制砖块
                     brick_rect = pygame.Rect(col + offset, row, brick_width, brick_height)
-                    pygame.draw.rect(self.image, BRICK_RED, brick_rect)
+                    pygame.draw.rect(surface, BRICK_RED, brick_rect)
                     
                     # 绘制砖块边框
-                    pygame.draw.rect(self.image, BRICK_BORDER, brick_rect, 1)
+                    pygame.draw.rect(surface, BRICK_BORDER, brick_rect, 1)
         
         # 绘制平台整体边框
         border_rect = pygame.Rect(0, 0, width, height)
-        pygame.draw.rect(self.image, BRICK_BORDER, border_rect, 2)
+        pygame.draw.rect(surface, BRICK_BORDER, border_rect, 2)
     
-    def draw_brick_with_spikes(self, width, height):
+    @staticmethod
+    def draw_brick_with_spikes(surface, width, height):
         """绘制带尖刺的砖块平台"""
         # 砖块颜色定义
         BRICK_RED = (0, 0, 0)  # 砖红色
@@ -95,7 +171,7 @@ class BrickPlatform(pygame.sprite.Sprite):
         SPIKE_BOTTOM = (100, 100, 100)  # 尖刺底部浅色
         
         # 填充背景
-        self.image.fill(BRICK_DARK_RED)
+        surface.fill(BRICK_DARK_RED)
         
         # 计算砖块尺寸
         brick_width = 40
@@ -114,10 +190,10 @@ class BrickPlatform(pygame.sprite.Sprite):
                 if col + offset + brick_width <= width and row + brick_height <= height - 10:
                     # 绘制砖块
                     brick_rect = pygame.Rect(col + offset, row, brick_width, brick_height)
-                    pygame.draw.rect(self.image, BRICK_RED, brick_rect)
+                    pygame.draw.rect(surface, BRICK_RED, brick_rect)
                     
                     # 绘制砖块边框
-                    pygame.draw.rect(self.image, BRICK_BORDER, brick_rect, 1)
+                    pygame.draw.rect(surface, BRICK_BORDER, brick_rect, 1)
         
         # 在平台顶部绘制尖刺
         spike_width = 10
@@ -132,52 +208,50 @@ class BrickPlatform(pygame.sprite.Sprite):
             ]
             
             # 绘制三角形尖刺
-            pygame.draw.polygon(self.image, SPIKE_TOP, spike_points)
-            pygame.draw.polygon(self.image, SPIKE_MIDDLE, [
+            pygame.draw.polygon(surface, SPIKE_TOP, spike_points)
+            pygame.draw.polygon(surface, SPIKE_MIDDLE, [
                 (x_pos + 1, height),
                 (x_pos + spike_width - 1, height),
                 (x_pos + spike_width // 2, height - spike_height)
             ])
-            pygame.draw.polygon(self.image, SPIKE_BOTTOM, spike_points, 1)  # 边框
+            pygame.draw.polygon(surface, SPIKE_BOTTOM, spike_points, 1)  # 边框
             
             x_pos += spike_width
         
         # 绘制平台整体边框
         border_rect = pygame.Rect(0, 0, width, height)
-        pygame.draw.rect(self.image, BRICK_BORDER, border_rect, 2)
+        pygame.draw.rect(surface, BRICK_BORDER, border_rect, 2)
     
-    def draw_spike_texture(self, width, height):
-        """绘制尖刺地面纹理 - 无限延伸效果"""
+    @staticmethod
+    def draw_spike_tile(surface, height):
+        """绘制一个尖刺图块，图块宽度就是尖刺宽度，左右相接即成连续的尖刺地面"""
         # 尖刺颜色定义
         SPIKE_TOP = (0, 0, 0)      # 尖刺顶部黑色
         SPIKE_MIDDLE = (50, 50, 50)   # 尖刺中间颜色
         SPIKE_BOTTOM = (100, 100, 100)  # 尖刺底部浅色
         
         # 透明化整个表面
-        self.image.fill((0, 0, 0, 0))
+        surface.fill((0, 0, 0, 0))
         
         # 计算三角形尺寸 - 使尖刺更大更突出
-        triangle_width = 15
+        triangle_width = BrickPlatform.SPIKE_WIDTH
         triangle_height = 40  # 增加高度，让尖刺更突出
         
-        # 绘制连续的三角形，形成无限延伸的尖刺效果
-        # 从负600位置开始绘制，确保从屏幕左边无缝进入
-        x_pos = -600  # 从负600位置开始，确保左侧扩展
-        while x_pos < width + 300:  # 直到超过右侧300个单位
-            # 绘制一个向上指的三角形（尖刺）
-            triangle_points = [
-                (x_pos, height),                           # 左下角（底部）
-                (x_pos + triangle_width, height),          # 右下角
-                (x_pos + triangle_width // 2, height - triangle_height)  # 顶点
-            ]
-            
-            # 绘制三角形尖刺
-            pygame.draw.polygon(self.image, SPIKE_TOP, triangle_points)
-            pygame.draw.polygon(self.image, SPIKE_MIDDLE, [
-                (x_pos + 2, height),
-                (x_pos + triangle_width - 2, height),
-                (x_pos + triangle_width // 2, height - triangle_height)
-            ])
-            pygame.draw.polygon(self.image, SPIKE_BOTTOM, triangle_points, 1)  # 边框
-            
-            x_pos += triangle_width
\ No newline at end of file
+        # 绘制一个向上指的三角形（尖刺）
+        triangle_points = [
+            (0, height),                           # 左下角（底部）
+            (triangle_width, height),              # 右下角
+            (triangle_width // 2, height - triangle_height)  # 顶点
+        ]
+        
+        # 绘制三角形尖刺
+        pygame.draw.polygon(surface, SPIKE_TOP, triangle_points)
+        pygame.draw.polygon(surface, SPIKE_MIDDLE, [
+            (2, height),
+            (triangle_width - 2, height),
+            (triangle_width // 2, height - triangle_height)
+        ])
+        pygame.draw.polygon(surface, SPIKE_BOTTOM, triangle_points, 1)  # 边框
+
+
+BrickPlatform.textures = TextureCache(BrickPlatform.create_texture)
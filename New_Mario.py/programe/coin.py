@@ -45,6 +45,12 @@ class Coin(pygame.sprite.Sprite):
         highlight_pos = (center_x - 4, center_y - 4)
         pygame.draw.circle(self.image, GOLD_HIGHLIGHT, highlight_pos, 4)
     
+    def reset(self, x, y):
+        """从对象池取出后重新放置金币"""
+        self.rect.x = x
+        self.rect.y = y
+        self.angle = 0
+    
     def update(self, platforms=None):
         """更新金币状态"""
         # 旋转动画
@@ -1,9 +1,14 @@
 # constants.py - 游戏常量定义
 # 游戏常量
 # -*- coding: utf-8 -*-
+import os
+
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+TICK_RATE = 60  # 游戏逻辑每秒固定更新次数，GRAVITY 等速度都是按每次更新计算的
+RENDER_FPS = 120  # 绘制帧率上限，0 表示不限制
+MAX_TICKS_PER_FRAME = 5  # 一帧最多补几次逻辑更新，防止卡顿后越追越慢
 GRAVITY = 0.5
 JUMP_STRENGTH = -12
 PLAYER_SPEED = 5
@@ -28,4 +33,45 @@ PLATFORM = "platform"
 # 在 constants.py 文件末尾添加
 # 箭矢尺寸
 ARROW_WIDTH = 10
-ARROW_HEIGHT = 30
\ No newline at end of file
+ARROW_HEIGHT = 30
+
+# 空间哈希网格单元大小（像素）
+SPATIAL_CELL_SIZE = 128
+
+# 平台和金币落到摄像机下方超过该距离后回收
+DESPAWN_DISTANCE = 1200
+# 对象池中每种对象最多保留的数量
+POOL_MAX_PER_KEY = 200
+
+# 文字渲染缓存最多保留的表面数量
+TEXT_CACHE_SIZE = 64
+
+# 没有平台使用的平台纹理最多保留的数量；平台进入视野外扩这么多像素的范围时才取得纹理
+TEXTURE_CACHE_SIZE = 32
+TEXTURE_MARGIN = 200
+
+# 脏矩形绘制：是否启用，变化区域超过屏幕面积的这个比例时改为整屏重画
+DIRTY_RECTS = True
+DIRTY_FULL_REDRAW_RATIO = 0.5
+
+# 视差背景：生成图层用的种子、图层缓存目录、各层随摄像机纵向滚动的比例（天空不动）
+BACKGROUND_SEED = 0
+BACKGROUND_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+PARALLAX_CLOUDS = 0.05
+PARALLAX_MOUNTAINS = 0.15
+PARALLAX_TREES = 0.3
+
+# 流式关卡生成：每块横带的高度、每排平台数、提前生成的距离
+CHUNK_HEIGHT = 600
+PLATFORMS_PER_ROW = 3
+GENERATION_LOOKAHEAD = 1200
+# 后台生成线程最多提前准备的横带数，每帧最多放置的平台和金币数
+LEVEL_QUEUE_SIZE = 4
+LEVEL_SPAWN_BUDGET = 6
+
+# 性能分析：环形缓冲区保存的帧数，叠加显示每隔多少帧刷新一次
+PROFILE_HISTORY = 600
+PROFILE_OVERLAY_INTERVAL = 30
+
+# 箭矢数组的初始容量（不够时自动扩大）
+ARROW_FIELD_CAPACITY = 256
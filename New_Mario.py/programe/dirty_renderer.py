@@ -0,0 +1,70 @@
+# dirty_renderer.py - 脏矩形绘制：背景和摄像机不动时只重画有变化的区域
+# -*- coding: utf-8 -*-
+import pygame
+from constants import *
+
+
+class DirtyRenderer:
+    """记住上一帧画了哪些 (图像, 位置)，与本帧比较找出变化的区域
+
+    只在这些区域内恢复背景并重画与之相交的图像，返回需要提交给 pygame.display.update 的矩形。
+    摄像机滚动、第一帧或变化区域过大时整屏重画
+    """
+
+    def __init__(self, screen, background=None):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        if background is None:
+            background = pygame.Surface(self.screen_rect.size)
+            background.fill(WHITE)
+        self.background = background
+        self.previous = None  # 上一帧画过的 {(图像, x, y, 宽, 高)}
+        self.full_area = self.screen_rect.width * self.screen_rect.height
+
+    def invalidate(self):
+        """下一帧整屏重画"""
+        self.previous = None
+
+    def draw(self, blits, full=False):
+        """按顺序画出 blits（(图像, 坐标或矩形) 列表）
+
+        返回变化区域的矩形列表（可能为空，表示画面没有变化）；整屏重画时返回 None，调用者应 flip
+        """
+        items = [(image, pygame.Rect(dest[0], dest[1], image.get_width(), image.get_height()))
+                 for image, dest in blits]
+        current = {(image, rect.x, rect.y, rect.w, rect.h) for image, rect in items}
+        previous = self.previous
+        self.previous = current
+
+        if not full and previous is not None:
+            dirty = self.merge(pygame.Rect(key[1:]) for key in previous ^ current)
+            if sum(rect.w * rect.h for rect in dirty) <= self.full_area * DIRTY_FULL_REDRAW_RATIO:
+                for rect in dirty:
+                    self.redraw(rect, items)
+                return dirty
+
+        self.screen.blit(self.background, (0, 0))
+        self.screen.blits([(image, rect) for image, rect in items], doreturn=False)
+        return None
+
+    def merge(self, rects):
+        """裁剪到屏幕内并合并互相重叠的矩形"""
+        merged = []
+        for rect in rects:
+            rect = rect.clip(self.screen_rect)
+            if not rect:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def redraw(self, area, items):
+        """在 area 内恢复背景，再按顺序重画与之相交的图像"""
+        screen = self.screen
+        screen.set_clip(area)
+        screen.blit(self.background, area, area)
+        screen.blits([(image, rect) for image, rect in items if rect.colliderect(area)], doreturn=False)
+        screen.set_clip(None)
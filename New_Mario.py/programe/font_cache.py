@@ -0,0 +1,59 @@
+# font_cache.py - 字体注册表和文字渲染缓存
+# -*- coding: utf-8 -*-
+import pygame
+from collections import OrderedDict
+from constants import *
+
+# 常见的中文字体，按顺序尝试
+FONTS_TO_TRY = ['simhei', 'simkai', 'simsun', 'microsoftyahei', 'arialunicode']
+
+
+class FontRegistry:
+    """按字号缓存已解析的字体，每种字号只查找一次系统字体"""
+
+    def __init__(self, font_names=FONTS_TO_TRY):
+        self.font_names = font_names
+        self.fonts = {}  # 字号 -> pygame.font.Font
+
+    def get(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.resolve(size)
+            self.fonts[size] = font
+        return font
+
+    def resolve(self, size):
+        """查找支持中文的字体：先找 Windows 字体文件，再找系统字体，最后用默认字体"""
+        for font_name in self.font_names:
+            try:
+                return pygame.font.Font(f"C:/Windows/Fonts/{font_name}.ttf", size)
+            except FileNotFoundError:
+                try:
+                    return pygame.font.SysFont(font_name, size)
+                except:
+                    continue
+        return pygame.font.SysFont(None, size)
+
+
+class TextCache:
+    """缓存渲染好的文字表面，按 (字体, 文字, 颜色) 索引，超出容量时淘汰最久未用的"""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
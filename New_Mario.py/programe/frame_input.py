@@ -0,0 +1,43 @@
+# frame_input.py - 单帧输入的位掩码表示
+# -*- coding: utf-8 -*-
+import pygame
+
+# 输入位定义（按住类）
+INPUT_LEFT = 1      # 按住 A 键
+INPUT_RIGHT = 2     # 按住 D 键
+INPUT_SPRINT = 4    # 按住 Shift 键
+# 输入位定义（按下类，只在按下的那一帧有效）
+INPUT_JUMP = 8      # 按下 W 键
+INPUT_ANY_KEY = 16  # 按下任意键（游戏结束时用于重新开始）
+
+INPUT_NONE = 0
+# 按下类输入位
+INPUT_PRESS_MASK = INPUT_JUMP | INPUT_ANY_KEY
+
+
+class FrameKeys:
+    """把输入位掩码包装成 pygame.key.get_pressed() 的样子，供 Game.update 使用"""
+
+    def __init__(self, flags=INPUT_NONE):
+        self.flags = flags
+
+    def __getitem__(self, key):
+        if key == pygame.K_a:
+            return bool(self.flags & INPUT_LEFT)
+        if key == pygame.K_d:
+            return bool(self.flags & INPUT_RIGHT)
+        if key == pygame.K_LSHIFT or key == pygame.K_RSHIFT:
+            return bool(self.flags & INPUT_SPRINT)
+        return False
+
+
+def flags_from_keys(keys):
+    """从按键状态（get_pressed 的返回值）计算按住类输入位"""
+    flags = INPUT_NONE
+    if keys[pygame.K_a]:
+        flags |= INPUT_LEFT
+    if keys[pygame.K_d]:
+        flags |= INPUT_RIGHT
+    if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
+        flags |= INPUT_SPRINT
+    return flags
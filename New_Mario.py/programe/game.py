@@ -3,42 +3,100 @@ import pygame
 import os
 import random
 import sys
+import time
+from collections import deque
 # import io  # 注释掉这行，避免不必要的导入
 # sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')  # 注释掉这行
 from constants import *
 from player import Player
 from brick_platform import BrickPlatform
-from background_generator import generate_background
+from parallax_background import ParallaxBackground
 from coin import Coin
-from arrow import Arrow
+from arrow import ArrowField
+from frame_input import FrameKeys, flags_from_keys, INPUT_NONE, INPUT_JUMP, INPUT_ANY_KEY, INPUT_PRESS_MASK
+from spatial_hash import SpatialGroup
+from object_pool import ObjectPool
+from level_generator import LevelGenerator, CoinSpec
+from level_worker import LevelWorker, CHUNK_NOT_READY
+from level_loader import LevelLoader
+from font_cache import FontRegistry, TextCache
+from replay import InputRecorder
+from profiler import FrameProfiler
+from dirty_renderer import DirtyRenderer
+from snapshot import pack_game, unpack_game
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, profile_csv=None, level=None):
         # 获取当前脚本所在目录
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        print(f"当前脚本目录: {current_dir}")  # 调试信息
+        
+        # 无窗口模式：使用SDL的dummy驱动，不绘制画面，也不打印调试信息，供批量模拟和测试使用
+        self.headless = headless
+        if not self.headless:
+            print(f"当前脚本目录: {current_dir}")  # 调试信息
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            if not pygame.get_init():
+                pygame.init()
         
         # 创建屏幕
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("平台跳跃游戏")
         self.clock = pygame.time.Clock()
         
-        # 生成背景图片
-        self.background_img = generate_background(SCREEN_WIDTH, SCREEN_HEIGHT)
+        # 每局游戏独立的随机数生成器，相同的种子和输入会得到完全相同的过程
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        
+        # 分阶段性能计时，F3 切换叠加显示，profile_csv 不为空时退出时导出CSV
+        self.profiler = FrameProfiler()
+        self.profile_csv = profile_csv
+        self.show_profiler = False
+        self.profiler_lines = []
+        
+        # 输入录制（见 start_recording），pending_presses 暂存本帧的按键按下事件
+        self.recorder = None
+        self.pending_presses = INPUT_NONE
+        
+        # 多层视差背景，图层缓存在磁盘上，无窗口模式下不需要
+        self.background = None if self.headless else ParallaxBackground(SCREEN_WIDTH, SCREEN_HEIGHT)
+        
+        # 脏矩形绘制：摄像机不动时只重画变化的区域（dirty_rects 为 False 时每帧整屏重画），天空作为底图
+        self.renderer = None if self.headless else DirtyRenderer(self.screen, self.background.sky)
+        self.dirty_rects = DIRTY_RECTS
+        self.draw_offset = None  # 本帧和上一帧绘制时摄像机的整数位置
+        self.last_draw_offset = None
+        
+        # 字体只在启动时解析一次，文字表面按内容缓存
+        self.fonts = FontRegistry()
+        self.text_cache = TextCache()
+        if not self.headless:
+            self.fonts.get(24)
+            self.fonts.get(48)
 
         # 创建精灵组
         self.all_sprites = pygame.sprite.Group()
-        self.platforms = pygame.sprite.Group()
-        self.coins = pygame.sprite.Group()  # 金币精灵组
+        self.platforms = SpatialGroup()  # 平台组带空间哈希索引，碰撞只查询附近单元
+        self.coins = SpatialGroup()  # 金币精灵组，同样带空间索引供绘制时裁剪
+        self.textured_platforms = set()  # 在摄像机附近、已取得纹理的平台
+        
+        # 对象池：回收落到摄像机下方的平台和金币，生成新平台时复用
+        self.platform_pool = ObjectPool()
+        self.coin_pool = ObjectPool()
+        self.despawn_distance = DESPAWN_DISTANCE
+        
+        # 指定了关卡文件（.json 或 .lvl，见 level_loader.py）时按文件放置平台，否则随机生成
+        self.level = LevelLoader.load(level) if level else None
         
         # 设置初始重生点在第一个安全平台上
-        self.respawn_point = (250, 400)  # 第一个安全平台的位置
+        self.spawn_point = self.level.spawn if self.level else (250, 400)  # 第一个安全平台的位置
+        self.respawn_point = self.level.respawn if self.level else self.spawn_point
         
         # 设置初始得分基准高度 - 修正为正确值
-        self.base_height = self.respawn_point[1]  # 以出生位置的高度为基准
+        self.base_height = self.spawn_point[1]  # 以出生位置的高度为基准
         
         # 创建玩家 - 在安全平台上生成
-        self.player = Player(self.respawn_point[0], self.respawn_point[1])
+        self.player = Player(self.spawn_point[0], self.spawn_point[1])
         self.all_sprites.add(self.player)
         
         # 平台生成控制
@@ -47,7 +105,7 @@ class Game:
         
         # 游戏得分
         self.score = 0
-        self.max_height_reached = self.respawn_point[1]  # 修正：初始高度应为玩家的y坐标
+        self.max_height_reached = self.spawn_point[1]  # 修正：初始高度应为玩家的y坐标
         
         # 摄像机偏移
         self.camera_offset_x = 0
@@ -56,10 +114,21 @@ class Game:
         # 游戏状态
         self.game_over = False
         self.restart_timer = 0  # 用于控制闪烁效果
+        self.death_cause = None  # 最近一次死亡的原因
+        self.next_layout = None  # 游戏结束期间为下一局准备的关卡
+        self.level_worker = None  # 有窗口时在后台生成横带的线程
+        self.pending_spawns = deque()  # 已取出但还没变成精灵的平台和金币
 
-        self.arrows = pygame.sprite.Group()
-        self.all_sprites.add(self.arrows)
+        # 箭矢不再是单独的精灵，而是统一保存在 NumPy 数组中
+        self.arrows = ArrowField()
+        self.arrow_width = ARROW_WIDTH
+        self.max_arrow_density = 0.4  # 箭矢最大生成概率
+        self.arrow_spawn_timer = 0
         self.update_camera()
+        
+        # 上一次逻辑更新前的位置，绘制时在两次更新之间插值
+        self.previous_camera = (self.camera_offset_x, self.camera_offset_y)
+        self.previous_positions = {}
 
         
         # 创建关卡
@@ -67,123 +136,216 @@ class Game:
 
     
     def create_level(self):
-        # 尖刺地面平台 - 扩展范围以支持左右移动，包括向左延伸
-        # 将尖刺地面放置在更宽的范围内，确保摄像机向左移动时也有尖刺
-        ground = BrickPlatform(-SCREEN_WIDTH, SCREEN_HEIGHT - 40, SCREEN_WIDTH * 3, 40, DEATH_GROUND)
-        self.platforms.add(ground)
-        self.all_sprites.add(ground)
-        
-        # 初始安全平台
-        platform1 = BrickPlatform(200, 450, 100, 20)
-        self.platforms.add(platform1)
-        self.all_sprites.add(platform1)
-        
+        self.create_start_platforms()
 
-        # 预生成平台直到达到最大高度限制
+        # 开始流式生成平台
         self.pre_generate_platforms()
 
         self.pre_spawn_arrows()
     
+    def create_start_platforms(self):
+        """创建尖刺地面和初始安全平台，它们的位置每局都相同（关卡文件自带初始平台）"""
+        # 尖刺地面平台 - 扩展范围以支持左右移动，包括向左延伸
+        # 将尖刺地面放置在更宽的范围内，确保摄像机向左移动时也有尖刺
+        self.ground = self.make_platform(-SCREEN_WIDTH, SCREEN_HEIGHT - 40, SCREEN_WIDTH * 3, 40, DEATH_GROUND)
+        
+        # 初始安全平台
+        self.start_platform = None if self.level else self.make_platform(200, 450, 100, 20)
+    
     def pre_generate_platforms(self):
-        """预先生成平台直到达到最大高度限制"""
-        # 从初始平台开始向上生成
-        current_highest = min(platform.rect.y for platform in self.platforms if platform != self.player)
+        """开始新的流式关卡生成，并预先生成摄像机上方的若干块平台"""
+        # 从初始平台开始向上生成，关卡文件从最低的横带开始
+        if self.level:
+            current_highest = self.level.bottom
+        else:
+            current_highest = min(platform.rect.y for platform in self.platforms)
+        # 关卡生成使用从主随机数生成器派生的独立序列，不受箭矢生成的影响
+        self.new_layout(self.rng.getrandbits(64), current_highest)
+        self.start_streaming()
+    
+    def new_layout(self, layout_seed, start_y):
+        """用关卡种子创建关卡生成器，相同的种子和起点生成相同的关卡
+        
+        如果游戏结束画面期间已经准备好了这个关卡（见 prepare_next_layout），直接使用准备好的横带
+        """
+        prepared = self.next_layout
+        self.next_layout = None
+        self.layout_seed = layout_seed
+        self.layout_start = start_y
+        if self.level:
+            # 关卡文件可以按序号直接读取横带，不需要生成器和缓存（见 cached_chunks）
+            self.level_generator = None
+            chunks = iter(())
+            self.layout_chunks = []
+        elif prepared is not None and prepared[:2] == (layout_seed, start_y):
+            self.level_generator, chunks, self.layout_chunks = prepared[2:]
+        else:
+            level_rng = random.Random(layout_seed)
+            self.level_generator = LevelGenerator(start_y, self.max_height_limit, rng=level_rng)
+            chunks = self.level_generator.chunks()
+            self.layout_chunks = []  # 本关卡已生成过的横带，重开时可以按顺序重新放置
+        
+        # 有窗口时在后台线程中提前生成后续横带；无窗口模式不在乎单帧耗时，直接在主线程生成
+        if self.level_worker is not None:
+            self.level_worker.stop()
+            self.level_worker = None
+        if self.headless or self.level:
+            self.chunk_source = chunks
+        else:
+            self.level_worker = LevelWorker(chunks)
+            self.chunk_source = self.level_worker
+    
+    def prepare_next_layout(self):
+        """游戏结束画面闪烁期间每帧准备下一局关卡的一块横带，重开时不用再生成
+        
+        下一局的关卡种子要到重开时才从 self.rng 中取出，这里用随机数状态的副本预先算出，
+        不改变 self.rng，所以准备与否都不影响之后的随机序列
+        """
+        if self.level:
+            return  # 关卡文件不需要准备
+        if self.next_layout is None:
+            peek = random.Random()
+            peek.setstate(self.rng.getstate())
+            layout_seed = peek.getrandbits(64)
+            generator = LevelGenerator(self.layout_start, self.max_height_limit, rng=random.Random(layout_seed))
+            self.next_layout = (layout_seed, self.layout_start, generator, generator.chunks(), [])
+            return
         
-        # 生成平台直到达到最大高度限制或生成指定数量
-        platforms_generated = 0
-        max_platforms_to_generate = 120  # 限制总生成平台数量，减少40%
+        # 重开后摄像机回到出生点，准备到那时需要的高度即可
+        chunks = self.next_layout[4]
+        if chunks and chunks[-1].top <= -GENERATION_LOOKAHEAD:
+            return
+        chunk = next(self.next_layout[3], None)
+        if chunk is not None:
+            chunks.append(chunk)
+            # 提前绘制新尺寸平台的纹理，重开时不再绘制（无窗口模式不绘制纹理）
+            if not self.headless:
+                for spec in chunk.platforms:
+                    BrickPlatform.get_texture(spec.width, spec.height, spec.platform_type, spec.has_spikes)
+    
+    def start_streaming(self):
+        """从关卡起点开始按顺序放置横带"""
+        self.level_chunks = self.cached_chunks()
+        self.next_chunk = 0  # 下一块要放置的横带序号
+        self.generated_top = self.layout_start  # 已取出的横带中最高平台的位置
+        self.pending_spawns.clear()
+        self.stream_level(budget=None)
+    
+    def cached_chunks(self, index=0):
+        """从第 index 块开始逐块产出本关卡的横带：生成过的直接取缓存，其余的再交给关卡生成器
         
-        while current_highest > self.max_height_limit and platforms_generated < max_platforms_to_generate:
-            # 计算要生成的新平台数量
-            platforms_needed = min(3, max_platforms_to_generate - platforms_generated)  # 每次生成最多3个平台，减少40%
-            
-            for i in range(platforms_needed):
-                if platforms_generated >= max_platforms_to_generate:
-                    break
-                    
-                # 从当前最高平台向上生成，确保跳跃可达
-                # 平台之间的垂直距离不能小于火柴人两倍高度
-                min_vertical_distance = PLAYER_HEIGHT * 2 + 20  # 火柴人两倍高度+缓冲
-                max_jump_height = abs(JUMP_STRENGTH) * 2.5  # 二段跳估算的最大高度
-                
-                # 确保跳跃高度不小于最小距离
-                actual_max_height = max(min_vertical_distance, int(max_jump_height))
-                y_pos = current_highest - random.randint(min_vertical_distance, actual_max_height)
-                
-                # 确保不超过最大高度限制
-                if y_pos < self.max_height_limit:
-                    y_pos = self.max_height_limit
-                
-                # 生成x坐标
-                x_pos = random.randint(50, SCREEN_WIDTH - 100)
-                
-                # 确定是否生成带尖刺的平台 (5%概率)
-                is_spike_platform = random.random() < 0.05
-                
-                # 确定是否生成移动平台 (10%概率，但在高度低于-1000时)
-                is_moving_platform = (random.random() < 0.1 and y_pos < -1000 and not is_spike_platform)
-                
-                # 检查新平台是否与现有平台重叠
-                overlap = True
-                attempts = 0
-                while overlap and attempts < 50:  # 最多重试50次
-                    overlap = False
-                    for platform in self.platforms:
-                        # 排除玩家，只检查平台间的碰撞
-                        if platform == self.player:
-                            continue
-                        # 检查新平台是否与现有平台重叠
-                        if (abs(platform.rect.x - x_pos) < 100 and 
-                            abs(platform.rect.y - y_pos) < 60):  # 减少垂直间隔
-                            overlap = True
-                            # 重新生成坐标
-                            actual_max_height = max(min_vertical_distance, int(max_jump_height))
-                            y_pos = current_highest - random.randint(min_vertical_distance, actual_max_height)
-                            # 确保不超过最大高度限制
-                            if y_pos < self.max_height_limit:
-                                y_pos = self.max_height_limit
-                            x_pos = random.randint(50, SCREEN_WIDTH - 100)
-                            break
-                    attempts += 1
-                
-                # 如果重试次数过多，仍然有重叠，强制生成
-                if attempts >= 50:
-                    # 采用固定间隔的方式生成平台
-                    x_pos = 100 + (platforms_generated * 200) % (SCREEN_WIDTH - 200)  # 在屏幕宽度内循环
-                    y_pos = current_highest - 100  # 固定垂直间隔
-                
-                # 创建新平台
-                if is_spike_platform:
-                    platform = BrickPlatform(x_pos, y_pos, 80, 15, PLATFORM, True)  # 创建带尖刺的平台
-                elif is_moving_platform:
-                    platform = BrickPlatform(x_pos, y_pos, 80, 15, PLATFORM, False, True)  # 创建移动平台
-                else:
-                    platform = BrickPlatform(x_pos, y_pos, 80, 15)
-                self.platforms.add(platform)
-                self.all_sprites.add(platform)
-                
-                # 每隔10个平台生成一个金币（约10个平台一次）
-                # 这里我们使用一个计数器来追踪平台数量
-                if hasattr(self, 'platform_count'):
-                    self.platform_count += 1
+        后台线程还没生成好下一块时不等待，产出 CHUNK_NOT_READY，调用者之后再次取值时重新检查
+        """
+        if self.level:
+            yield from self.level.chunks(index)
+            return
+        while True:
+            # 缓存还没到第 index 块时（例如恢复快照后）按顺序取到这一块为止
+            if index >= len(self.layout_chunks):
+                if self.level_worker is not None:
+                    chunk = self.level_worker.poll()
                 else:
-                    self.platform_count = 1
-                
-                # 每10个平台生成一次金币
-                if self.platform_count % 10 == 0:
-                    coin_x = x_pos + random.randint(10, 60)  # 在平台上的随机位置
-                    coin_y = y_pos - 20  # 在平台上方一点点
-                    coin = Coin(coin_x, coin_y)
-                    self.coins.add(coin)
-                    self.all_sprites.add(coin)
-                
-                platforms_generated += 1
-                if platforms_generated >= max_platforms_to_generate:
+                    chunk = next(self.chunk_source, None)
+                if chunk is CHUNK_NOT_READY:
+                    yield chunk
+                    continue
+                if chunk is None:  # 已达到最大高度限制
+                    return
+                self.layout_chunks.append(chunk)
+                continue
+            yield self.layout_chunks[index]
+            index += 1
+    
+    def layout_chunk(self, index):
+        """第 index 块横带（必须在关卡范围内），还没生成时等待生成，用于恢复快照"""
+        if self.level:
+            return self.level.chunk(index)
+        chunks = self.cached_chunks(len(self.layout_chunks))
+        while index >= len(self.layout_chunks):
+            if next(chunks) is CHUNK_NOT_READY:
+                self.level_worker.wait()
+        return self.layout_chunks[index]
+    
+    def stream_level(self, budget=LEVEL_SPAWN_BUDGET):
+        """摄像机接近已生成区域的顶部时取出后续的平台块，每帧最多放置 budget 个平台或金币
+        
+        budget 按个数而不是按时间计算，这样放置进度只取决于帧数，相同的种子和输入结果相同。
+        后台线程还没生成好的横带不等待，下一帧再取；只有开局（budget 为 None）必须等起点附近的横带
+        """
+        target_y = self.camera_offset_y - GENERATION_LOOKAHEAD
+        while self.generated_top > target_y:
+            chunk = next(self.level_chunks, None)
+            if chunk is None:  # 已达到最大高度限制
+                break
+            if chunk is CHUNK_NOT_READY:
+                if budget is not None:
                     break
-            
-            # 更新当前最高平台
-            if self.platforms:
-                current_highest = min(platform.rect.y for platform in self.platforms if platform != self.player)
+                self.level_worker.wait()
+                continue
+            self.queue_chunk(chunk)
+        self.spawn_pending(budget)
+    
+    def queue_chunk(self, chunk):
+        """把一块关卡数据排进待放置队列"""
+        self.pending_spawns.extend(chunk.platforms)
+        self.pending_spawns.extend(chunk.coins)
+        self.generated_top = min(self.generated_top, chunk.top)
+        self.next_chunk = chunk.index + 1
+    
+    def spawn_pending(self, budget=LEVEL_SPAWN_BUDGET):
+        """把待放置队列中最多 budget 个平台和金币变成精灵，budget 为 None 时全部放置"""
+        pending = self.pending_spawns
+        count = len(pending) if budget is None else min(budget, len(pending))
+        for _ in range(count):
+            spec = pending.popleft()
+            if isinstance(spec, CoinSpec):
+                self.make_coin(spec.x, spec.y)
+            else:
+                self.make_platform(*spec)
+    
+    def make_platform(self, x, y, width, height, platform_type=PLATFORM, has_spikes=False, is_moving=False):
+        """创建平台并加入精灵组，优先从对象池复用"""
+        platform = self.platform_pool.acquire((width, height, platform_type, has_spikes))
+        if platform is None:
+            platform = BrickPlatform(x, y, width, height, platform_type, has_spikes, is_moving)
+        else:
+            platform.reset(x, y, is_moving)
+        self.platforms.add(platform)
+        self.all_sprites.add(platform)
+        return platform
+    
+    def make_coin(self, x, y):
+        """创建金币并加入精灵组，优先从对象池复用"""
+        coin = self.coin_pool.acquire(Coin)
+        if coin is None:
+            coin = Coin(x, y)
+        else:
+            coin.reset(x, y)
+        self.coins.add(coin)
+        self.all_sprites.add(coin)
+        return coin
+    
+    def retire_platform(self, platform):
+        """把平台移出所有精灵组并放回对象池"""
+        platform.kill()
+        platform.release_texture()
+        self.textured_platforms.discard(platform)
+        self.platform_pool.release(platform.pool_key, platform)
+    
+    def retire_coin(self, coin):
+        """把金币移出所有精灵组并放回对象池"""
+        coin.kill()
+        self.coin_pool.release(Coin, coin)
+    
+    def despawn_below_camera(self):
+        """回收落到摄像机下方超过 despawn_distance 的平台和金币（尖刺地面除外）"""
+        despawn_y = self.camera_offset_y + self.despawn_distance
+        for platform in self.platforms.sprites():
+            if platform.platform_type != DEATH_GROUND and platform.rect.top > despawn_y:
+                self.retire_platform(platform)
+        for coin in self.coins.sprites():
+            if coin.rect.top > despawn_y:
+                self.retire_coin(coin)
     
     def pre_spawn_arrows(self):
         """预生成一些箭矢"""
@@ -198,123 +360,42 @@ class Game:
         density_factor = min(self.max_arrow_density, height_factor * self.max_arrow_density)
         
         # 根据密度因子决定是否生成箭矢
-        if random.random() < density_factor:
+        if self.rng.random() < density_factor:
             # 在屏幕宽度范围内随机生成箭矢
-            x_pos = random.randint(0, SCREEN_WIDTH - self.arrow_width)
+            x_pos = self.rng.randint(0, SCREEN_WIDTH - self.arrow_width)
             # 从屏幕顶部或稍上方生成箭矢
-            y_pos = random.randint(-100, -30)
+            y_pos = self.rng.randint(-100, -30)
             
-            arrow = Arrow(x_pos, y_pos)
-            self.arrows.add(arrow)
-            self.all_sprites.add(arrow)
+            self.arrows.spawn(x_pos, y_pos, self.rng)
 
     def check_arrow_collisions(self):
         """检测箭矢与玩家的碰撞"""
         # 检测玩家与箭矢的碰撞
-        arrow_collisions = pygame.sprite.spritecollide(self.player, self.arrows, False)
-        for arrow in arrow_collisions:
+        if self.arrows.collides(self.player.rect):
             # 如果玩家碰到箭矢，触发死亡
-            self.player_die()
+            self.player_die("arrow")
             return True
         return False    
     def generate_new_platforms(self):
-        """在上方随机生成新平台，确保平台间距离适中"""
-        # 获取当前最高平台的大致位置
-        current_highest = min(platform.rect.y for platform in self.platforms if platform != self.player)
-
-        # 计算要生成的新平台数量
-        platforms_needed = 2  # 每次生成2个新平台，减少40%
-
-        # 估算二段跳最大距离
-        # 跳跃公式: v^2 = u^2 + 2as, 其中v=0, u=JUMP_STRENGTH, a=-GRAVITY
-        # 最大高度 = u^2 / (2*g) * 2 (考虑两段跳)
-        # 估算二段跳最大水平距离 (考虑玩家最大移动速度)
-        max_horizontal_distance = int(PLAYER_SPEED * SPRINT_MULTIPLIER * 8)  # 估算值
-
-        # 生成新平台，确保它们之间有合理的距离
-        for i in range(platforms_needed):
-            # 从当前最高平台向上生成，确保跳跃可达
-            # 平台之间的垂直距离不能小于火柴人两倍高度
-            min_vertical_distance = PLAYER_HEIGHT * 2 + 20  # 火柴人两倍高度+缓冲
-            max_jump_height = abs(JUMP_STRENGTH) * 2.5  # 二段跳估算的最大高度
-            
-            # 确保跳跃高度不小于最小距离
-            actual_max_height = max(min_vertical_distance, int(max_jump_height))
-            y_pos = current_highest - random.randint(min_vertical_distance, actual_max_height)  # 修复范围问题
-            
-            # 确保不超过最大高度限制
-            if y_pos < self.max_height_limit:
-                y_pos = self.max_height_limit
-            
-            # 估算玩家水平跳跃距离
-            horizontal_range = min(max_horizontal_distance, SCREEN_WIDTH)
-            x_pos = random.randint(50, max(50, SCREEN_WIDTH - 50 - horizontal_range))
-            
-            # 确定是否生成带尖刺的平台 (5%概率)
-            is_spike_platform = random.random() < 0.05
-            
-            # 确定是否生成移动平台 (10%概率，但在高度低于-1000时)
-            is_moving_platform = (random.random() < 0.1 and y_pos < -1000 and not is_spike_platform)
-            
-            # 检查新平台是否与现有平台重叠
-            overlap = True
-            attempts = 0
-            while overlap and attempts < 50:  # 最多重试50次
-                overlap = False
-                for platform in self.platforms:
-                    # 排除玩家，只检查平台间的碰撞
-                    if platform == self.player:
-                        continue
-                    # 检查新平台是否与现有平台重叠
-                    if (abs(platform.rect.x - x_pos) < 100 and 
-                        abs(platform.rect.y - y_pos) < 60):  # 减少垂直间隔
-                        overlap = True
-                        # 重新生成坐标
-                        actual_max_height = max(min_vertical_distance, int(max_jump_height))
-                        y_pos = current_highest - random.randint(min_vertical_distance, actual_max_height)
-                        # 确保不超过最大高度限制
-                        if y_pos < self.max_height_limit:
-                            y_pos = self.max_height_limit
-                        x_pos = random.randint(50, max(50, SCREEN_WIDTH - 50))
-                        break
-                attempts += 1
-            
-            # 如果重试次数过多，仍然有重叠，强制生成
-            if attempts >= 50:
-                # 采用固定间隔的方式生成平台
-                x_pos = 100 + (i * 200) % (SCREEN_WIDTH - 200)  # 在屏幕宽度内循环
-                y_pos = current_highest - 100  # 固定垂直间隔
-            
-            # 创建新平台
-            if is_spike_platform:
-                platform = BrickPlatform(x_pos, y_pos, 80, 15, PLATFORM, True)  # 创建带尖刺的平台
-            elif is_moving_platform:
-                platform = BrickPlatform(x_pos, y_pos, 80, 15, PLATFORM, False, True)  # 创建移动平台
-            else:
-                platform = BrickPlatform(x_pos, y_pos, 80, 15)
-            self.platforms.add(platform)
-            self.all_sprites.add(platform)
-            
-            # 每隔10个平台生成一个金币（约10个平台一次）
-            # 这里我们使用一个计数器来追踪平台数量
-            if hasattr(self, 'platform_count'):
-                self.platform_count += 1
-            else:
-                self.platform_count = 1
-            
-            # 每10个平台生成一次金币
-            if self.platform_count % 10 == 0:
-                coin_x = x_pos + random.randint(10, 60)  # 在平台上的随机位置
-                coin_y = y_pos - 20  # 在平台上方一点点
-                coin = Coin(coin_x, coin_y)
-                self.coins.add(coin)
-                self.all_sprites.add(coin)
+        """玩家向上移动后继续流式生成上方的平台"""
+        self.stream_level()
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            elif event.type == pygame.WINDOWEXPOSED:
+                # 窗口被遮挡后重新显示时，屏幕内容可能已丢失，下一帧整屏重画
+                self.renderer.invalidate()
             elif event.type == pygame.KEYDOWN:
+                # F3 切换性能分析叠加显示
+                if event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                    continue
+                # 记下本帧的按键按下事件，供输入录制使用
+                self.pending_presses |= INPUT_ANY_KEY
+                if event.key == pygame.K_w:
+                    self.pending_presses |= INPUT_JUMP
             # 如果游戏结束，按任意键重新开始
                 if self.game_over:
                     self.restart_game()
@@ -333,9 +414,13 @@ class Game:
                     self.player.set_sprint(False)
         return True
     
-    def restart_game(self):
-        """重新开始游戏"""
+    def restart_game(self, reuse_layout=False):
+        """重新开始游戏
+        
+        reuse_layout 为 True 时沿用本局已生成的关卡布局，跳过关卡生成，供强化学习环境快速重开
+        """
         self.game_over = False
+        self.death_cause = None
         self.player.rect.x = self.respawn_point[0]
         self.player.rect.y = self.respawn_point[1]
         self.player.vel_x = 0
@@ -344,48 +429,109 @@ class Game:
         # 重置得分
         self.score = 0
         self.max_height_reached = self.base_height
-        self.platform_count = 0  # 重置平台计数器
         
-        # 清除现有平台（除了地面）
-        self.platforms.empty()
-        self.coins.empty()
-        self.all_sprites.empty()
+        # 尖刺地面和初始平台位置固定，直接保留；其余平台和金币回收到对象池中供重新生成时复用
+        keep_start = self.ground.alive() and (self.start_platform is None or self.start_platform.alive())
+        for platform in self.platforms.sprites():
+            if not (keep_start and (platform is self.ground or platform is self.start_platform)):
+                self.retire_platform(platform)
+        for coin in self.coins.sprites():
+            self.retire_coin(coin)
+        self.all_sprites.remove(self.player)
         
 
         # 清除箭矢
-        self.arrows.empty()
+        self.arrows.clear()
     
         # 重置箭矢生成计时器
         self.arrow_spawn_timer = 0
 
-        # 重新创建地面
-        ground = BrickPlatform(-SCREEN_WIDTH, SCREEN_HEIGHT - 40, SCREEN_WIDTH * 3, 40, DEATH_GROUND)
-        self.platforms.add(ground)
-        self.all_sprites.add(ground)
+        # 初始平台已被回收时重新创建地面和初始平台
+        if not keep_start:
+            self.create_start_platforms()
         
-        # 重新创建初始平台
-        platform1 = BrickPlatform(200, 450, 100, 20)
-        self.platforms.add(platform1)
-        self.all_sprites.add(platform1)
+        # 摄像机回到出生点，这样平台只需生成到出生点上方
+        self.camera_offset_x = 0
+        self.camera_offset_y = 0
+        self.update_camera()
+        self.previous_camera = (self.camera_offset_x, self.camera_offset_y)
+        self.previous_positions = {}
         
-        # 预生成平台直到达到最大高度限制
-        self.pre_generate_platforms()
+        # 开始流式生成平台
+        if reuse_layout:
+            self.start_streaming()
+        else:
+            self.pre_generate_platforms()
         
         # 重新添加玩家到精灵组
         self.all_sprites.add(self.player)
     
-    def update(self):
+    def step(self, frames=1, inputs=None):
+        """不经过事件循环和帧率限制，直接推进若干帧游戏逻辑
+        
+        inputs 可以是 None（无输入）、一个输入位掩码（每帧相同），
+        或者一个长度不小于 frames 的位掩码序列（逐帧输入），位定义见 frame_input.py
+        """
+        for i in range(frames):
+            if inputs is None:
+                flags = INPUT_NONE
+            elif isinstance(inputs, int):
+                flags = inputs
+            else:
+                flags = inputs[i]
+            
+            # 与 handle_events 中 KEYDOWN 的处理保持一致
+            self.pending_presses = flags & INPUT_PRESS_MASK
+            if flags & INPUT_PRESS_MASK:
+                if self.game_over:
+                    self.restart_game()
+                elif flags & INPUT_JUMP:
+                    self.player.jump()
+            
+            self.profiler.begin_frame()
+            self.update(FrameKeys(flags))
+            self.profiler.end_frame()
+    
+    def snapshot(self):
+        """把当前局面打包成紧凑的二进制数据，可以用 restore 恢复（格式见 snapshot.py）"""
+        return pack_game(self)
+    
+    def restore(self, data):
+        """恢复 snapshot 保存的局面，之后的过程与保存时继续运行完全相同"""
+        unpack_game(self, data)
+    
+    def start_recording(self):
+        """开始录制逐帧输入，需在第一帧之前调用，录像可用 replay.py 回放"""
+        self.recorder = InputRecorder(self.seed)
+        return self.recorder
+    
+    def update(self, keys=None):
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        
+        # 录制本帧的输入（按住的键 + 按下事件）
+        if self.recorder is not None:
+            self.recorder.record(flags_from_keys(keys) | self.pending_presses)
+        self.pending_presses = INPUT_NONE
+        
+        # 记录本次更新前的位置供绘制插值（无窗口模式不绘制，不需要记录）
+        if not self.headless:
+            self.previous_camera = (self.camera_offset_x, self.camera_offset_y)
+            self.previous_positions = {self.player: self.player.rect.topleft}
+        self.profiler.mark('input')
+        
         # 如果游戏结束，只更新闪烁效果计时器
         if self.game_over:
             self.restart_timer = (self.restart_timer + 1) % 60  # 每秒闪烁一次
+            self.prepare_next_layout()
+            self.profiler.mark('generation')
             return
         self.arrow_spawn_timer += 1
         if self.arrow_spawn_timer >= 30:  # 每半秒尝试生成箭矢
             self.spawn_arrow()
             self.arrow_spawn_timer = 0
+        self.profiler.mark('arrows')
 
-        keys = pygame.key.get_pressed()
-        
         # 左右移动键改为 'a' 和 'd'
         if keys[pygame.K_a]:
             self.player.move_left()
@@ -401,12 +547,17 @@ class Game:
             self.player.set_sprint(True)
         else:
             self.player.set_sprint(False)
+        self.profiler.mark('input')
             
         # 更新所有精灵（包括移动平台）
         for sprite in self.all_sprites:
             if isinstance(sprite, BrickPlatform) and sprite.is_moving:
+                if not self.headless:
+                    self.previous_positions[sprite] = sprite.rect.topleft
                 sprite.update()  # 更新移动平台
         self.all_sprites.update(self.platforms)
+        self.arrows.update()
+        self.profiler.mark('sprites')
         # 检测箭矢碰撞
         self.check_arrow_collisions()
 
@@ -414,22 +565,25 @@ class Game:
         coin_collisions = pygame.sprite.spritecollide(self.player, self.coins, True)
         for coin in coin_collisions:
             self.score += 30  # 拾取金币增加30分
+            self.coin_pool.release(Coin, coin)
         
         # 重置地面状态
         self.player.on_ground = False
         
         # 检测碰撞并判断死亡 - 这里是关键修改部分
-        collisions = pygame.sprite.spritecollide(self.player, self.platforms, False)
+        # 尖刺地面与绘制一样在水平方向无限延伸，只比较纵向位置，碰到立即死亡
+        ground = self.ground
+        if (ground.alive() and self.player.rect.bottom > ground.rect.top and
+                self.player.rect.top < ground.rect.bottom):
+            self.player_die("death_ground")
+            self.profiler.mark('collision')
+            return  # 立即返回，避免其他处理
+        
+        collisions = self.platforms.collide(self.player.rect)
         for platform in collisions:
-            # 检查是否与尖刺地面碰撞
-            if hasattr(platform, 'platform_type') and platform.platform_type == DEATH_GROUND:
-                # 如果与尖刺地面碰撞，立即死亡
-                if (self.player.rect.bottom >= platform.rect.top and 
-                    self.player.rect.top <= platform.rect.bottom and
-                    self.player.rect.right > platform.rect.left and 
-                    self.player.rect.left < platform.rect.right):
-                    self.player_die()
-                    return  # 立即返回，避免其他处理
+            # 尖刺地面已经在上面检查过
+            if platform.platform_type == DEATH_GROUND:
+                continue
             # 检查是否与带尖刺的平台碰撞
             elif hasattr(platform, 'has_spikes') and platform.has_spikes:
                 # 如果平台有尖刺，且玩家碰撞到尖刺部分，则死亡
@@ -438,23 +592,33 @@ class Game:
                     self.player.rect.bottom <= platform.rect.top + 10 and  # 尖刺高度大约10像素
                     self.player.rect.right > platform.rect.left and 
                     self.player.rect.left < platform.rect.right):
-                    self.player_die()
+                    self.player_die("spikes")
+                    self.profiler.mark('collision')
                     return  # 立即返回，避免其他处理
         
         # 检查是否掉出屏幕底部
         if self.player.rect.y > SCREEN_HEIGHT:
-            self.player_die()
+            self.player_die("fall")
+        self.profiler.mark('collision')
         
         # 更新得分 - 基于玩家达到的最高高度
         self.update_score()
+        self.profiler.mark('score')
         
         # 如果玩家到达当前最高点上方，生成新平台
         if self.player.rect.y < self.max_height_reached - self.platform_generation_threshold:  # 当玩家向上移动超过阈值时
             self.generate_new_platforms()
             self.max_height_reached = self.player.rect.y
+            # 顺便回收已经远离视野的平台和金币
+            self.despawn_below_camera()
+        elif self.pending_spawns:
+            # 继续放置上一次没放完的横带
+            self.spawn_pending()
+        self.profiler.mark('generation')
         
         # 摄像机跟随玩家
         self.update_camera()
+        self.profiler.mark('camera')
     
     def update_score(self):
         """更新游戏得分"""
@@ -464,9 +628,11 @@ class Game:
         height_gained = max(0, self.base_height - self.max_height_reached)  # 确保不为负值
         self.score = height_gained // 10  # 每上升10像素得1分
 
-    def player_die(self):
-        """处理玩家死亡事件"""
-        print(f"Player died! Final score: {self.score}")
+    def player_die(self, cause=None):
+        """处理玩家死亡事件，cause 记录死因：arrow/death_ground/spikes/fall"""
+        if not self.headless:
+            print(f"Player died! Final score: {self.score}")
+        self.death_cause = cause
         self.game_over = True
         self.restart_timer = 0  # 重置闪烁计时器
     
@@ -499,60 +665,95 @@ class Game:
         max_camera_y = 0  # 不让相机低于起始位置太多
         self.camera_offset_y = max(min_camera_y, min(self.camera_offset_y, max_camera_y))
     
-    def draw(self):
-        # 绘制背景
-        if self.background_img:
-            # 如果有背景图片则绘制图片
-            self.screen.blit(self.background_img, (0, 0))
-        else:
-            # 否则填充默认颜色
-            self.screen.fill(WHITE)
-        
-        # 绘制所有精灵
-        for sprite in self.all_sprites:
-            if not isinstance(sprite, Arrow):
-                screen_x = sprite.rect.x - self.camera_offset_x
-                screen_y = sprite.rect.y - self.camera_offset_y  # 添加y轴偏移
-                self.screen.blit(sprite.image, (screen_x, screen_y))
+    def visible_blits(self, alpha=1.0):
+        """生成视野内精灵的 (图像, 屏幕坐标) 列表：平台、金币、玩家、箭矢依次绘制
+        
+        alpha 为两次逻辑更新之间的插值比例，移动的精灵和摄像机按上一次和本次更新的位置插值
+        """
+        previous_x, previous_y = self.previous_camera
+        offset_x = previous_x + (self.camera_offset_x - previous_x) * alpha
+        offset_y = previous_y + (self.camera_offset_y - previous_y) * alpha
+        view = pygame.Rect(int(offset_x), int(offset_y), SCREEN_WIDTH + 1, SCREEN_HEIGHT + 1)
+        self.draw_offset = view.topleft
+        self.update_textures(view)
+        
+        # 尖刺地面在水平方向无限延伸，只要视野与地面高度相交就绘制
+        blits = []
+        ground = self.ground
+        if ground.alive() and view.top < ground.rect.bottom and view.bottom > ground.rect.top:
+            blits.append(ground.floor_blit(view.left, offset_x, offset_y))
+        
+        visible = [platform for platform in self.platforms.collide(view) if platform is not ground]
+        visible += self.coins.collide(view)
+        visible.append(self.player)
+        
+        previous_positions = self.previous_positions
+        for sprite in visible:
+            x, y = sprite.rect.topleft
+            previous = previous_positions.get(sprite)
+            if previous is not None:
+                x = previous[0] + (x - previous[0]) * alpha
+                y = previous[1] + (y - previous[1]) * alpha
+            blits.append((sprite.image, (x - offset_x, y - offset_y)))
+        
+        # 箭矢最后绘制，共用同一张图像
+        blits += self.arrows.visible_blits(view, offset_x, offset_y, alpha)
+        return blits
+    
+    def update_textures(self, view):
+        """视野向外扩展 TEXTURE_MARGIN 范围内的平台取得纹理，离开这个范围的平台释放纹理"""
+        nearby = set(self.platforms.collide(view.inflate(TEXTURE_MARGIN * 2, TEXTURE_MARGIN * 2)))
+        for platform in self.textured_platforms - nearby:
+            platform.release_texture()
+        for platform in nearby - self.textured_platforms:
+            platform.materialize()
+        self.textured_platforms = nearby
+    
+    def draw(self, alpha=1.0):
+        # 无窗口模式下不绘制
+        if self.headless:
+            return
         
-
-        # 单独绘制箭矢
-        for arrow in self.arrows:
-            screen_x = arrow.rect.x - self.camera_offset_x
-            screen_y = arrow.rect.y - self.camera_offset_y
-            self.screen.blit(arrow.image, (screen_x, screen_y))
-    
-        # 使用系统字体来显示中文
-        # 首先尝试几种常见的中文字体
-        fonts_to_try = ['simhei', 'simkai', 'simsun', 'microsoftyahei', 'arialunicode']
-        font = None
-        for font_name in fonts_to_try:
-            try:
-                font = pygame.font.Font(f"C:/Windows/Fonts/{font_name}.ttf", 24)
-                break
-            except FileNotFoundError:
-                try:
-                    font = pygame.font.SysFont(font_name, 24)
-                    break
-                except:
-                    continue
+        # 先画视差背景，再画与摄像机视野相交的精灵，最后叠加文字
+        blits = self.visible_blits(alpha)
+        blits = self.background.blits(self.draw_offset[1]) + blits
+        blits += self.hud_blits()
+        
+        # 性能分析叠加显示
+        if self.show_profiler:
+            blits += self.profiler_overlay_blits()
+        
+        # 摄像机滚动时所有精灵都会移动，整屏重画；否则只重画变化的区域
+        scrolled = self.draw_offset != self.last_draw_offset
+        self.last_draw_offset = self.draw_offset
+        dirty = self.renderer.draw(blits, full=scrolled or not self.dirty_rects)
+        self.profiler.mark('draw')
+        
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        self.profiler.mark('flip')
+    
+    def hud_blits(self):
+        """得分、高度和游戏结束提示文字的 (图像, 位置) 列表"""
+        blits = []
         
-        # 如果找不到中文字体，使用默认字体
-        if font is None:
-            font = pygame.font.SysFont(None, 24)
+        # 使用启动时解析好的中文字体
+        font = self.fonts.get(24)
         
         # # 显示提示信息
         # text = font.render("使用 A/D 键移动，W 键跳跃", True, RED)
         # self.screen.blit(text, (10, 10))
         
         # 显示当前得分
-        score_text = font.render(f"游戏得分: {self.score}", True, RED)
-        self.screen.blit(score_text, (10, 35))
+        score_text = self.text_cache.render(font, f"游戏得分: {self.score}", RED)
+        blits.append((score_text, (10, 35)))
         
         # 显示当前高度
         current_height = self.base_height - self.player.rect.y  # 计算当前高度（相对于起始点）
-        height_text = font.render(f"当前高度: {current_height}", True, RED)
-        self.screen.blit(height_text, (10, 60))
+        height_text = self.text_cache.render(font, f"当前高度: {current_height}", RED)
+        blits.append((height_text, (10, 60)))
         
         # 显示当前重生点信息
         # respawn_text = font.render(f"Respawn: ({self.respawn_point[0]}, {self.respawn_point[1]})", True, RED)
@@ -560,25 +761,12 @@ class Game:
         
         # 如果游戏结束，显示重新开始提示
         if self.game_over:
-            large_font = None
-            for font_name in fonts_to_try:
-                try:
-                    large_font = pygame.font.Font(f"C:/Windows/Fonts/{font_name}.ttf", 48)
-                    break
-                except FileNotFoundError:
-                    try:
-                        large_font = pygame.font.SysFont(font_name, 48)
-                        break
-                    except:
-                        continue
-
-            if large_font is None:
-                large_font = pygame.font.SysFont(None, 48)
+            large_font = self.fonts.get(48)
                 
-            game_over_text = large_font.render("GAME OVER!", True, RED)
-            restart_text = font.render("按任意键重新开始", True, RED)
+            game_over_text = self.text_cache.render(large_font, "GAME OVER!", RED)
+            restart_text = self.text_cache.render(font, "按任意键重新开始", RED)
             # 添加最终得分显示
-            final_score_text = font.render(f"最终得分: {self.score}", True, RED)
+            final_score_text = self.text_cache.render(font, f"最终得分: {self.score}", RED)
             
             # 居中显示文本
             game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 60))
@@ -587,19 +775,65 @@ class Game:
             
             # 闪烁效果：每秒闪烁一次
             if self.restart_timer < 30:  # 半秒亮半秒暗
-                self.screen.blit(game_over_text, game_over_rect)
-                self.screen.blit(restart_text, restart_rect)
-                self.screen.blit(final_score_text, final_score_rect)
-        
-        pygame.display.flip()
+                blits.append((game_over_text, game_over_rect))
+                blits.append((restart_text, restart_rect))
+                blits.append((final_score_text, final_score_rect))
+        return blits
+    
+    def profiler_overlay_blits(self):
+        """在右上角显示各阶段耗时的 p50/p99（毫秒）和精灵数量"""
+        # 统计每隔一段时间刷新一次，避免排序本身影响帧时间
+        if not self.profiler_lines or self.profiler.index % PROFILE_OVERLAY_INTERVAL == 0:
+            sprite_counts = {
+                'sprites': len(self.all_sprites),
+                'platforms': len(self.platforms),
+                'coins': len(self.coins),
+                'arrows': len(self.arrows),
+            }
+            self.profiler_lines = self.profiler.overlay_lines(sprite_counts)
+        
+        font = self.fonts.get(16)
+        texts = [self.text_cache.render(font, line, BLUE) for line in self.profiler_lines]
+        x = SCREEN_WIDTH - max(text.get_width() for text in texts) - 10
+        y = 10
+        blits = []
+        for text in texts:
+            blits.append((text, (x, y)))
+            y += text.get_height()
+        return blits
                 
                     
     def run(self):
+        """固定步长主循环：逻辑按 TICK_RATE 固定频率更新，绘制频率与之无关"""
+        tick_time = 1.0 / TICK_RATE
+        accumulator = 0.0
+        previous_time = time.perf_counter()
         running = True
         while running:
+            now = time.perf_counter()
+            accumulator += now - previous_time
+            previous_time = now
+            
+            self.profiler.begin_frame()
             running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            self.profiler.mark('events')
+            
+            # 按累积的时间补足逻辑更新，卡顿时最多补 MAX_TICKS_PER_FRAME 次
+            ticks = 0
+            while accumulator >= tick_time and ticks < MAX_TICKS_PER_FRAME:
+                self.update()
+                accumulator -= tick_time
+                ticks += 1
+            if ticks == MAX_TICKS_PER_FRAME and accumulator >= tick_time:
+                accumulator = 0.0  # 放弃追不上的时间，游戏暂时变慢而不是卡死
+            
+            # 用剩余时间在上一次和本次更新之间插值绘制
+            self.draw(accumulator / tick_time)
+            self.profiler.end_frame()
+            self.clock.tick(RENDER_FPS)
+        
+        # 退出时导出性能分析数据
+        if self.profile_csv:
+            self.profiler.write_csv(self.profile_csv)
         
         pygame.quit()
\ No newline at end of file
@@ -0,0 +1,184 @@
+# level_benchmark.py - 关卡生成的基准测试，按种子和最大高度统计生成速度、重试次数和内存占用，输出JSON
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# JSON 默认输出到标准输出，不能混入 pygame 导入时打印的欢迎信息
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+from constants import *
+from level_generator import LevelGenerator
+
+START_Y = 450  # 与 Game 中初始平台的位置相同
+STREAM_STEP = 10  # 模拟爬升时摄像机每帧上移的像素
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def bench_generator(seed, max_height_limit):
+    """直接运行关卡生成器：生成速度、每个平台的重试次数、强制放置次数"""
+    generator = LevelGenerator(START_Y, max_height_limit, rng=random.Random(seed))
+    start = time.perf_counter()
+    chunks = list(generator.chunks())
+    seconds = time.perf_counter() - start
+    platforms = generator.platform_count
+
+    return {
+        'chunks': len(chunks),
+        'platforms': platforms,
+        'coins': sum(len(chunk.coins) for chunk in chunks),
+        'seconds': seconds,
+        'platforms_per_second': platforms / max(seconds, 1e-9),
+        'retries_per_platform': generator.retries / max(platforms, 1),
+        'fallbacks': generator.fallbacks,
+        'fallback_rate': generator.fallbacks / max(platforms, 1),
+        'platform_bytes_per_1000': bench_platform_memory(chunks),
+    }
+
+
+def bench_platform_memory(chunks):
+    """把生成的平台通过 Game.make_platform 变成精灵（含精灵组和空间索引中的记录），
+    测量每1000个存活平台占用的内存；纹理由同尺寸的平台共享且无窗口模式不创建，不计在内"""
+    from game import Game
+
+    game = Game(headless=True, seed=0)
+    specs = [spec for chunk in chunks for spec in chunk.platforms]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for spec in specs:
+        game.make_platform(*spec)
+    platform_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return platform_bytes * 1000 / max(len(specs), 1)
+
+
+def bench_game(seed, max_height_limit):
+    """在无窗口游戏中测量 pre_generate_platforms（重新开始时的整段生成）和
+    generate_new_platforms（爬升时的流式生成，每帧一次调用）的耗时"""
+    from game import Game
+
+    game = Game(headless=True, seed=seed)
+    game.max_height_limit = max_height_limit
+
+    # 重新开始一次，按新的最大高度重建关卡
+    start = time.perf_counter()
+    game.restart_game()
+    pre_seconds = time.perf_counter() - start
+    pre_platforms = len(game.platforms)
+
+    # 摄像机逐帧上移，模拟玩家一直向上爬，直到关卡生成完并全部放置
+    call_ms = []
+    streamed = 0
+    while True:
+        game.camera_offset_y -= STREAM_STEP
+        before = game.level_generator.platform_count
+        start = time.perf_counter()
+        game.generate_new_platforms()
+        call_ms.append((time.perf_counter() - start) * 1000.0)
+        game.despawn_below_camera()
+        streamed += game.level_generator.platform_count - before
+        if game.generated_top > game.camera_offset_y - GENERATION_LOOKAHEAD and not game.pending_spawns:
+            break  # 已达到最大高度限制，不再有新的横带
+
+    total_seconds = sum(call_ms) / 1000.0
+    return {
+        'pre_generate': {
+            'seconds': pre_seconds,
+            'platforms': pre_platforms,
+        },
+        'streaming': {
+            'calls': len(call_ms),
+            'platforms': streamed,
+            'seconds': total_seconds,
+            'platforms_per_second': streamed / max(total_seconds, 1e-9),
+            'call_ms_p50': percentile(call_ms, 50),
+            'call_ms_p99': percentile(call_ms, 99),
+            'call_ms_max': max(call_ms),
+            'live_platforms': len(game.platforms),
+        },
+    }
+
+
+def summarize(results):
+    """按最大高度汇总各种子的结果（取平均）"""
+    by_height = {}
+    for result in results:
+        by_height.setdefault(result['max_height_limit'], []).append(result)
+
+    summary = {}
+    for height, group in by_height.items():
+        def mean(section, key):
+            return sum(result[section][key] for result in group) / len(group)
+
+        summary[str(height)] = {
+            'runs': len(group),
+            'platforms': mean('generator', 'platforms'),
+            'platforms_per_second': mean('generator', 'platforms_per_second'),
+            'retries_per_platform': mean('generator', 'retries_per_platform'),
+            'fallback_rate': mean('generator', 'fallback_rate'),
+            'platform_bytes_per_1000': mean('generator', 'platform_bytes_per_1000'),
+            'pre_generate_seconds': sum(result['pre_generate']['seconds'] for result in group) / len(group),
+            'streaming_call_ms_p99': max(result['streaming']['call_ms_p99'] for result in group),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关卡生成基准测试")
+    parser.add_argument("--seeds", type=int, default=10, help="每个高度测试的种子数（从0开始）")
+    parser.add_argument("--heights", default="5000,10000,50000",
+                        help="逗号分隔的最大爬升高度，按向上为负换算成 max_height_limit（负值需写成 --heights=-5000）")
+    parser.add_argument("--output", default=None, help="结果写入的JSON文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    heights = [-abs(int(value)) for value in args.heights.split(",")]
+    results = []
+    for height in heights:
+        for seed in range(args.seeds):
+            result = {'seed': seed, 'max_height_limit': height}
+            result['generator'] = bench_generator(seed, height)
+            result.update(bench_game(seed, height))
+            results.append(result)
+            print(f"高度 {height} 种子 {seed}: {result['generator']['platforms']} 个平台", file=sys.stderr)
+
+    report = {
+        'environment': {
+            'python': sys.version.split()[0],
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+        },
+        'config': {
+            'seeds': args.seeds,
+            'heights': heights,
+            'start_y': START_Y,
+            'chunk_height': CHUNK_HEIGHT,
+            'platforms_per_row': PLATFORMS_PER_ROW,
+            'generation_lookahead': GENERATION_LOOKAHEAD,
+            'level_spawn_budget': LEVEL_SPAWN_BUDGET,
+        },
+        'results': results,
+        'summary': summarize(results),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
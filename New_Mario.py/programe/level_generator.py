@@ -0,0 +1,108 @@
+# level_generator.py - 按高度分块、流式生成关卡平台和金币
+# -*- coding: utf-8 -*-
+import random
+from collections import namedtuple
+from constants import *
+
+# 平台和金币只记录几何数据，由 Game 负责创建精灵
+PlatformSpec = namedtuple('PlatformSpec', ['x', 'y', 'width', 'height', 'platform_type', 'has_spikes', 'is_moving'])
+CoinSpec = namedtuple('CoinSpec', ['x', 'y'])
+# 一个高度横带：bottom 为横带底部，top 为其中最高平台的 y 坐标
+LevelChunk = namedtuple('LevelChunk', ['index', 'top', 'bottom', 'platforms', 'coins'])
+
+
+class LevelGenerator:
+    """从起始高度开始向上逐块生成平台，每块是一条固定高度的横带"""
+
+    def __init__(self, start_y, max_height_limit, chunk_height=CHUNK_HEIGHT, rng=random):
+        self.start_y = start_y
+        self.max_height_limit = max_height_limit
+        self.chunk_height = chunk_height
+        self.rng = rng
+
+        # 平台之间的垂直距离不能小于火柴人两倍高度
+        self.min_vertical_distance = PLAYER_HEIGHT * 2 + 20  # 火柴人两倍高度+缓冲
+        max_jump_height = abs(JUMP_STRENGTH) * 2.5  # 二段跳估算的最大高度
+        # 确保跳跃高度不小于最小距离
+        self.max_vertical_distance = max(self.min_vertical_distance, int(max_jump_height))
+
+        self.platform_count = 0  # 已生成的平台数，用于每10个平台生成一个金币
+        # 统计数据，供 level_benchmark.py 使用
+        self.retries = 0  # 因为重叠重新取位置的次数
+        self.fallbacks = 0  # 重试次数用完、改用固定间隔位置的次数
+
+    def chunks(self):
+        """逐块产出 LevelChunk，直到达到最大高度限制"""
+        index = 0
+        bottom = self.start_y
+        highest = self.start_y
+        previous = []  # 上一块的平台，重叠检测只看当前块和上一块
+
+        while highest > self.max_height_limit:
+            top = bottom - self.chunk_height
+            platforms = []
+            coins = []
+
+            # 每次在当前最高处上方生成一排平台，直到超出本块的上边界
+            while highest > top and highest > self.max_height_limit:
+                for i in range(PLATFORMS_PER_ROW):
+                    spec = self.place_platform(highest, previous + platforms)
+                    platforms.append(spec)
+
+                    # 每10个平台生成一次金币
+                    self.platform_count += 1
+                    if self.platform_count % 10 == 0:
+                        coin_x = spec.x + self.rng.randint(10, 60)  # 在平台上的随机位置
+                        coin_y = spec.y - 20  # 在平台上方一点点
+                        coins.append(CoinSpec(coin_x, coin_y))
+
+                # 更新当前最高平台
+                highest = min(spec.y for spec in platforms)
+
+            yield LevelChunk(index, highest, bottom, platforms, coins)
+            index += 1
+            bottom = top
+            previous = platforms
+
+    def random_position(self, highest):
+        """在当前最高平台上方随机取一个位置，确保跳跃可达"""
+        y_pos = highest - self.rng.randint(self.min_vertical_distance, self.max_vertical_distance)
+        # 确保不超过最大高度限制
+        if y_pos < self.max_height_limit:
+            y_pos = self.max_height_limit
+        x_pos = self.rng.randint(50, SCREEN_WIDTH - 100)
+        return x_pos, y_pos
+
+    def place_platform(self, highest, nearby):
+        """生成一个不与附近平台重叠的平台"""
+        x_pos, y_pos = self.random_position(highest)
+
+        # 确定是否生成带尖刺的平台 (5%概率)
+        is_spike_platform = self.rng.random() < 0.05
+
+        # 确定是否生成移动平台 (10%概率，但在高度低于-1000时)
+        is_moving_platform = (self.rng.random() < 0.1 and y_pos < -1000 and not is_spike_platform)
+
+        # 检查新平台是否与现有平台重叠
+        overlap = True
+        attempts = 0
+        while overlap and attempts < 50:  # 最多重试50次
+            overlap = False
+            for spec in nearby:
+                if (abs(spec.x - x_pos) < 100 and
+                    abs(spec.y - y_pos) < 60):  # 减少垂直间隔
+                    overlap = True
+                    self.retries += 1
+                    # 重新生成坐标
+                    x_pos, y_pos = self.random_position(highest)
+                    break
+            attempts += 1
+
+        # 如果重试次数过多，仍然有重叠，强制生成
+        if attempts >= 50:
+            self.fallbacks += 1
+            # 采用固定间隔的方式生成平台
+            x_pos = 100 + (self.platform_count * 200) % (SCREEN_WIDTH - 200)  # 在屏幕宽度内循环
+            y_pos = highest - 100  # 固定垂直间隔
+
+        return PlatformSpec(x_pos, y_pos, 80, 15, PLATFORM, is_spike_platform, is_moving_platform)
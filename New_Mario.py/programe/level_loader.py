@@ -0,0 +1,196 @@
+# level_loader.py - JSON 关卡文件的读取、编译成二进制缓存和按横带流式读取
+# -*- coding: utf-8 -*-
+import json
+import mmap
+import os
+import struct
+import sys
+from constants import *
+from level_generator import PlatformSpec, CoinSpec, LevelChunk
+
+# JSON 关卡格式（坐标与游戏世界坐标相同，y 向上为负，尖刺地面顶部在 y = SCREEN_HEIGHT - 40）：
+# {
+#     "name": "关卡名",
+#     "spawn": [250, 400],                 玩家出生位置（左上角），也是计分的基准高度
+#     "respawn": [250, 400],               重新开始时的位置，可省略，默认与 spawn 相同
+#     "platforms": [
+#         {"x": 200, "y": 450, "width": 100, "height": 20},
+#         {"x": 380, "y": 334, "spikes": true},   带尖刺的平台
+#         {"x": 560, "y": 218, "moving": true}    左右移动的平台
+#     ],
+#     "coins": [{"x": 400, "y": 314}]
+# }
+# width/height 可省略，默认与随机生成的平台相同（80x15）
+DEFAULT_PLATFORM_WIDTH = 80
+DEFAULT_PLATFORM_HEIGHT = 15
+
+# 二进制缓存格式：文件头 + 横带索引表 + 所有平台记录 + 所有金币记录
+# 平台和金币按横带排列，每条横带在索引表中记录自己的记录范围，读取时只访问用到的横带
+LEVEL_MAGIC = b'MLVL'
+LEVEL_VERSION = 1
+# 标识, 版本, 出生x, 出生y, 重生x, 重生y, 关卡底部, 横带高度, 横带数, 平台总数
+HEADER_FORMAT = struct.Struct('<4sHiiiiiiII')
+BAND_FORMAT = struct.Struct('<iiIIII')  # 最高平台y, 横带底部, 第一个平台序号, 平台数, 第一个金币序号, 金币数
+PLATFORM_FORMAT = struct.Struct('<iiHHB')  # x, y, 宽, 高, 标志位
+COIN_FORMAT = struct.Struct('<ii')  # x, y
+CACHE_SUFFIX = '.lvl'
+
+# 平台标志位
+PLATFORM_SPIKES = 1
+PLATFORM_MOVING = 2
+
+
+def read_level_json(path):
+    """读取并检查 JSON 关卡文件，返回 (出生点, 重生点, 平台列表, 金币列表)"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    try:
+        spawn = tuple(int(v) for v in data['spawn'])
+        respawn = tuple(int(v) for v in data.get('respawn', spawn))
+        platforms = [PlatformSpec(int(p['x']), int(p['y']),
+                                  int(p.get('width', DEFAULT_PLATFORM_WIDTH)),
+                                  int(p.get('height', DEFAULT_PLATFORM_HEIGHT)),
+                                  PLATFORM, bool(p.get('spikes', False)), bool(p.get('moving', False)))
+                     for p in data.get('platforms', [])]
+        coins = [CoinSpec(int(c['x']), int(c['y'])) for c in data.get('coins', [])]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"关卡文件格式错误: {path}: {e!r}")
+    if len(spawn) != 2 or len(respawn) != 2:
+        raise ValueError(f"关卡文件格式错误: {path}: spawn/respawn 必须是 [x, y]")
+    if not platforms:
+        raise ValueError(f"关卡文件格式错误: {path}: 至少需要一个平台")
+    return spawn, respawn, platforms, coins
+
+
+def compile_level(json_path, output_path, band_height=CHUNK_HEIGHT):
+    """把 JSON 关卡编译成按横带排列的二进制文件"""
+    spawn, respawn, platforms, coins = read_level_json(json_path)
+
+    # 从最低的平台开始向上划分横带，每条横带内部按从下到上的顺序排列，与随机生成的顺序一致
+    bottom = max(spec.y for spec in platforms) + 1
+    band_count = (bottom - min(spec.y for spec in platforms + coins) - 1) // band_height + 1
+    band_platforms = [[] for _ in range(band_count)]
+    band_coins = [[] for _ in range(band_count)]
+    for spec in platforms:
+        band_platforms[(bottom - 1 - spec.y) // band_height].append(spec)
+    for spec in coins:
+        band = min(max((bottom - 1 - spec.y) // band_height, 0), band_count - 1)
+        band_coins[band].append(spec)
+
+    data = bytearray(HEADER_FORMAT.pack(LEVEL_MAGIC, LEVEL_VERSION, spawn[0], spawn[1], respawn[0], respawn[1],
+                                        bottom, band_height, band_count, len(platforms)))
+    platform_index = 0
+    coin_index = 0
+    for i in range(band_count):
+        band_platforms[i].sort(key=lambda spec: -spec.y)
+        band_bottom = bottom - i * band_height
+        top = min((spec.y for spec in band_platforms[i]), default=band_bottom - band_height)
+        data += BAND_FORMAT.pack(top, band_bottom, platform_index, len(band_platforms[i]),
+                                 coin_index, len(band_coins[i]))
+        platform_index += len(band_platforms[i])
+        coin_index += len(band_coins[i])
+    for specs in band_platforms:
+        for spec in specs:
+            flags = (spec.has_spikes and PLATFORM_SPIKES) | (spec.is_moving and PLATFORM_MOVING)
+            data += PLATFORM_FORMAT.pack(spec.x, spec.y, spec.width, spec.height, flags)
+    for specs in band_coins:
+        for spec in specs:
+            data += COIN_FORMAT.pack(spec.x, spec.y)
+
+    # 先写临时文件再替换，避免游戏读到写了一半的缓存
+    temp_path = output_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, output_path)
+
+
+class MappedLevel:
+    """内存映射的二进制关卡，按横带随机读取，不把整个关卡读进内存"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, spawn_x, spawn_y, respawn_x, respawn_y, self.bottom, self.band_height,
+         self.band_count, platform_total) = HEADER_FORMAT.unpack_from(self.data)
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise ValueError(f"不是有效的关卡缓存文件: {path}")
+        self.spawn = (spawn_x, spawn_y)
+        self.respawn = (respawn_x, respawn_y)
+
+        self.bands_offset = HEADER_FORMAT.size
+        self.platforms_offset = self.bands_offset + self.band_count * BAND_FORMAT.size
+        self.coins_offset = self.platforms_offset + platform_total * PLATFORM_FORMAT.size
+
+    def __len__(self):
+        return self.band_count
+
+    def chunk(self, index):
+        """读取第 index 条横带，返回与关卡生成器相同的 LevelChunk"""
+        top, bottom, platform_start, platform_count, coin_start, coin_count = BAND_FORMAT.unpack_from(
+            self.data, self.bands_offset + index * BAND_FORMAT.size)
+
+        start = self.platforms_offset + platform_start * PLATFORM_FORMAT.size
+        end = start + platform_count * PLATFORM_FORMAT.size
+        platforms = [PlatformSpec(x, y, width, height, PLATFORM, bool(flags & PLATFORM_SPIKES),
+                                  bool(flags & PLATFORM_MOVING))
+                     for x, y, width, height, flags in PLATFORM_FORMAT.iter_unpack(self.data[start:end])]
+
+        start = self.coins_offset + coin_start * COIN_FORMAT.size
+        end = start + coin_count * COIN_FORMAT.size
+        coins = [CoinSpec(x, y) for x, y in COIN_FORMAT.iter_unpack(self.data[start:end])]
+        return LevelChunk(index, top, bottom, platforms, coins)
+
+    def chunks(self, index=0):
+        """从第 index 条横带开始按顺序产出横带"""
+        for i in range(index, self.band_count):
+            yield self.chunk(i)
+
+    def close(self):
+        self.data.close()
+
+
+class LevelLoader:
+    """关卡加载工厂：根据文件类型选择加载方式，都返回 MappedLevel
+
+    .json 文件先编译成同名的 .lvl 缓存（JSON 比缓存新时重新编译），.lvl 文件直接映射
+    """
+
+    @classmethod
+    def load(cls, path):
+        extension = os.path.splitext(path)[1].lower()
+        loader = cls.loaders.get(extension)
+        if loader is None:
+            raise ValueError(f"不支持的关卡文件类型: {path}")
+        return loader(path)
+
+    @staticmethod
+    def load_json(path):
+        cache_path = os.path.splitext(path)[0] + CACHE_SUFFIX
+        if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+            compile_level(path, cache_path)
+        return MappedLevel(cache_path)
+
+    loaders = {
+        '.json': load_json.__func__,
+        CACHE_SUFFIX: MappedLevel,
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python level_loader.py 关卡.json [输出.lvl]")
+        return
+
+    json_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(json_path)[0] + CACHE_SUFFIX
+    compile_level(json_path, output_path)
+    level = MappedLevel(output_path)
+    print(f"已编译: {output_path}  横带数: {len(level)}  出生点: {level.spawn}  文件大小: {os.path.getsize(output_path)} 字节")
+    level.close()
+
+
+if __name__ == "__main__":
+    main()
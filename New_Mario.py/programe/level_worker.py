@@ -0,0 +1,86 @@
+# level_worker.py - 在后台线程中提前生成关卡横带
+# -*- coding: utf-8 -*-
+import queue
+import threading
+from constants import *
+
+
+# poll 时后台线程还没生成好下一块横带
+CHUNK_NOT_READY = object()
+
+
+class LevelWorker:
+    """在后台线程中运行关卡生成器，把生成好的横带（纯数据，不含 Surface）放进有界队列
+
+    用法与生成器相同：next(worker) 按顺序取出下一块横带，生成器结束后抛出 StopIteration，
+    后台还没生成好时 next 会等待；主线程每帧调用 poll 则不等待，没生成好时返回 CHUNK_NOT_READY。
+    取出的横带序列与直接运行生成器完全相同，生成器抛出的异常会在取到那个位置时重新抛出
+    """
+
+    def __init__(self, chunks, capacity=LEVEL_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=capacity)
+        self.stopped = threading.Event()
+        self.finished = False
+        self.peeked = None  # wait 已经从队列中取出、还没交给调用者的一项
+        self.thread = threading.Thread(target=self.run, args=(chunks,), daemon=True)
+        self.thread.start()
+
+    def run(self, chunks):
+        try:
+            for chunk in chunks:
+                if not self.put(chunk):
+                    return
+        except Exception as e:
+            self.put(e)  # 交给主线程重新抛出，否则主线程会一直等不到结束标记
+            return
+        self.put(None)  # 生成器结束的标记
+
+    def put(self, item):
+        """队列满时等待，stop 之后放弃"""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def wait(self):
+        """等待下一块横带生成好（不取出）"""
+        if self.peeked is None and not self.finished:
+            self.peeked = self.queue.get()
+
+    def poll(self):
+        """不等待地取出下一块横带：还没生成好时返回 CHUNK_NOT_READY，生成器结束后返回 None"""
+        if self.finished:
+            return None
+        if self.peeked is None:
+            try:
+                self.peeked = self.queue.get_nowait()
+            except queue.Empty:
+                return CHUNK_NOT_READY
+        return self.take()
+
+    def take(self):
+        item, self.peeked = self.peeked, None
+        if item is None or isinstance(item, Exception):
+            self.finished = True
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.finished:
+            raise StopIteration
+        self.wait()
+        chunk = self.take()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+
+    def stop(self):
+        """不再需要这个关卡时停止后台线程"""
+        self.stopped.set()
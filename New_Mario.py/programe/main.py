@@ -2,11 +2,21 @@
 # -*- coding: utf-8 -*-
 import pygame
 import sys
+import argparse
 
 from start import StartScreen  # 导入开始页面
 from game import Game
 
 if __name__ == "__main__":
+    # 命令行参数：--seed 指定随机种子，--record 把本局输入录制到文件（可用 replay.py 回放），
+    # --profile 退出时把分阶段帧耗时导出为CSV，--level 使用关卡文件（.json 或 .lvl）代替随机生成
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", default=None)
+    parser.add_argument("--profile", default=None)
+    parser.add_argument("--level", default=None)
+    args = parser.parse_args()
+    
     pygame.init()  # 在这里初始化pygame
     
     # 先显示开始页面
@@ -14,5 +24,10 @@ if __name__ == "__main__":
     start_screen.run()
     
     # 开始页面结束后启动游戏
-    game = Game()
-    game.run()
\ No newline at end of file
+    game = Game(seed=args.seed, profile_csv=args.profile, level=args.level)
+    if args.record:
+        game.start_recording()
+    game.run()
+    if args.record:
+        game.recorder.save(args.record)
+        print(f"录像已保存: {args.record}（种子 {game.seed}）")
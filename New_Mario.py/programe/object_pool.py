@@ -0,0 +1,30 @@
+# object_pool.py - 对象池，回收并复用离开视野的精灵
+# -*- coding: utf-8 -*-
+from constants import *
+
+
+class ObjectPool:
+    """按键（如平台尺寸和类型）分类保存回收的对象，取用时优先复用"""
+
+    def __init__(self, max_per_key=POOL_MAX_PER_KEY):
+        self.max_per_key = max_per_key
+        self.free = {}  # key -> 可复用对象列表
+
+    def acquire(self, key):
+        """取出一个可复用对象，没有时返回 None"""
+        objects = self.free.get(key)
+        if objects:
+            return objects.pop()
+        return None
+
+    def release(self, key, obj):
+        """回收对象，超过上限时直接丢弃"""
+        objects = self.free.setdefault(key, [])
+        if len(objects) < self.max_per_key:
+            objects.append(obj)
+
+    def clear(self):
+        self.free.clear()
+
+    def __len__(self):
+        return sum(len(objects) for objects in self.free.values())
@@ -0,0 +1,136 @@
+# parallax_background.py - 多层视差背景，图层按种子生成一次并缓存到磁盘
+# -*- coding: utf-8 -*-
+import os
+import random
+import struct
+
+import pygame
+from constants import *
+from background_generator import generate_layers
+
+# 天空之上按顺序叠加的图层：(层名, 随摄像机纵向滚动的比例, 是否上下循环拼接)
+PARALLAX_LAYERS = (
+    ('clouds', PARALLAX_CLOUDS, True),
+    ('mountains', PARALLAX_MOUNTAINS, False),
+    ('trees', PARALLAX_TREES, False),
+)
+LAYER_NAMES = ('sky',) + tuple(name for name, rate, tiled in PARALLAX_LAYERS)
+
+# 透明图层的像素只有完全透明和完全不透明两种，用这个颜色表示透明，绘制时按颜色键跳过（RLE 加速）
+COLORKEY = (255, 0, 255)
+
+# 磁盘缓存格式：文件头 + 每层的裁剪范围 + 每层裁剪后的 RGB 像素（按 LAYER_NAMES 的顺序）
+BACKGROUND_MAGIC = b'MBKG'
+BACKGROUND_VERSION = 1
+HEADER_FORMAT = struct.Struct('<4sHIII')  # 标识, 版本, 种子, 屏幕宽, 屏幕高
+LAYER_FORMAT = struct.Struct('<iiII')  # 裁剪范围的 x, y, 宽, 高
+
+
+class ParallaxBackground:
+    """多层视差背景
+
+    天空不动，作为脏矩形绘制的底图（sky）；其余各层按 PARALLAX_LAYERS 的比例随 camera_offset_y 向下滚动，
+    每帧只有几次 blit。图层由种子决定，第一次生成后裁剪掉透明的边缘保存在 cache_dir 中，
+    之后用相同种子和屏幕尺寸启动时直接读取
+    """
+
+    def __init__(self, width, height, seed=BACKGROUND_SEED, cache_dir=BACKGROUND_CACHE_DIR):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.cache_dir = cache_dir
+
+        layers = self.load()
+        if layers is None:
+            layers = self.crop(generate_layers(width, height, random.Random(seed)))
+            self.save(layers)
+
+        # 已创建窗口时转换成显示格式，再设置颜色键，加快绘制
+        converted = []
+        for name, (image, rect) in zip(LAYER_NAMES, layers):
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
+            if name != 'sky':
+                image.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            converted.append((image, rect))
+        self.sky = converted[0][0]
+        self.layers = [(image, rect, rate, tiled)
+                       for (image, rect), (name, rate, tiled) in zip(converted[1:], PARALLAX_LAYERS)]
+
+    @staticmethod
+    def crop(layers):
+        """把生成的透明图层裁剪到有内容的范围，透明像素换成颜色键，返回 [(图像, 在屏幕上的范围)]"""
+        cropped = []
+        for name in LAYER_NAMES:
+            layer = layers[name]
+            rect = layer.get_bounding_rect()
+            image = pygame.Surface(rect.size)
+            image.fill(COLORKEY)
+            image.blit(layer, (0, 0), rect)
+            cropped.append((image, rect))
+        return cropped
+
+    @property
+    def cache_path(self):
+        return os.path.join(self.cache_dir, f"background_{self.seed}_{self.width}x{self.height}.bin")
+
+    def load(self):
+        """读取磁盘缓存，不存在或与种子、屏幕尺寸对不上时返回 None"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            magic, version, seed, width, height = HEADER_FORMAT.unpack_from(data)
+            if (magic, version, seed, width, height) != (BACKGROUND_MAGIC, BACKGROUND_VERSION,
+                                                         self.seed, self.width, self.height):
+                return None
+            offset = HEADER_FORMAT.size
+            rects = []
+            for _ in LAYER_NAMES:
+                rects.append(pygame.Rect(LAYER_FORMAT.unpack_from(data, offset)))
+                offset += LAYER_FORMAT.size
+
+            layers = []
+            for rect in rects:
+                size = rect.w * rect.h * 3
+                layers.append((pygame.image.frombytes(data[offset:offset + size], rect.size, 'RGB'), rect))
+                offset += size
+        except (struct.error, ValueError):
+            return None
+        return layers
+
+    def save(self, layers):
+        """写入磁盘缓存，目录不可写时只是下次启动还要重新生成"""
+        data = bytearray(HEADER_FORMAT.pack(BACKGROUND_MAGIC, BACKGROUND_VERSION, self.seed, self.width, self.height))
+        for image, rect in layers:
+            data += LAYER_FORMAT.pack(*rect)
+        for image, rect in layers:
+            data += pygame.image.tobytes(image, 'RGB')
+
+        # 先写临时文件再替换，避免读到写了一半的缓存
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = self.cache_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"背景缓存写入失败: {e}")
+
+    def blits(self, offset_y):
+        """天空之上各层的 (图像, 屏幕坐标) 列表，offset_y 为摄像机的纵向位置（向上为负）"""
+        blits = []
+        for image, rect, rate, tiled in self.layers:
+            shift = int(-offset_y * rate)
+            if tiled:
+                shift %= self.height
+                positions = (rect.y + shift, rect.y + shift - self.height)
+            else:
+                positions = (rect.y + shift,)
+            for y in positions:
+                if y < self.height and y + rect.h > 0:
+                    blits.append((image, (rect.x, y)))
+        return blits
@@ -6,6 +6,9 @@ from constants import *
 import sys
 
 class Player(pygame.sprite.Sprite):
+    # 姿势缓存：(is_jumping, jump_direction, is_sprinting, facing_right) -> 图像
+    pose_cache = {}
+    
     def __init__(self, x, y):
         super().__init__()
         
@@ -36,40 +39,11 @@ class Player(pygame.sprite.Sprite):
         self.rect.y = self.start_y
     
     def load_character_image(self):
-        """绘制火柴人角色"""
-        # 创建角色表面
-        self.image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
-        
-        # 定义颜色
-        HEAD_COLOR = (0, 0, 0)        # 黑色头部
-        BODY_COLOR = (0, 0, 0)        # 黑色身体
-        LIMB_COLOR = (0, 0, 0)        # 黑色四肢
-        
-        # 绘制火柴人 - 使用简单的几何图形
-        center_x = PLAYER_WIDTH // 2
-        head_radius = 6
-        
-        # 绘制头部 (圆形)
-        pygame.draw.circle(self.image, HEAD_COLOR, (center_x, head_radius + 2), head_radius)
-        
-        # 绘制身体 (线条)
-        body_start = (center_x, head_radius * 2 + 2)  # 从头部下方开始
-        body_end = (center_x, PLAYER_HEIGHT // 2 + 5)  # 身体长度
-        pygame.draw.line(self.image, BODY_COLOR, body_start, body_end, 2)
-        
-        # 绘制手臂
-        arm_start = body_start
-        arm_end_left = (center_x - 8, PLAYER_HEIGHT // 2 - 5)
-        arm_end_right = (center_x + 8, PLAYER_HEIGHT // 2 - 5)
-        pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_left, 2)
-        pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_right, 2)
-        
-        # 绘制腿
-        leg_start = body_end
-        leg_end_left = (center_x - 6, PLAYER_HEIGHT - 5)
-        leg_end_right = (center_x + 6, PLAYER_HEIGHT - 5)
-        pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_left, 2)
-        pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_right, 2)
+        """设置火柴人角色的初始图像"""
+        # 所有姿势只在第一次创建玩家时绘制一次
+        if not Player.pose_cache:
+            Player.build_pose_cache()
+        self.update_sprite_image()
         
         # 创建rect对象
         self.rect = self.image.get_rect()
@@ -107,7 +81,11 @@ class Player(pygame.sprite.Sprite):
             self.vel_y = 10
     
     def check_collisions(self, platforms, direction):
-        collisions = pygame.sprite.spritecollide(self, platforms, False)
+        # 平台组带空间索引时只查询玩家附近的网格单元
+        if hasattr(platforms, 'collide'):
+            collisions = platforms.collide(self.rect)
+        else:
+            collisions = pygame.sprite.spritecollide(self, platforms, False)
         
         for platform in collisions:
             # 如果是尖刺地面，特殊处理
@@ -185,9 +163,29 @@ class Player(pygame.sprite.Sprite):
         self.update_sprite_image()
     
     def update_sprite_image(self):
-        """更新火柴人的图像，根据奔跑状态和跳跃状态"""
+        """根据奔跑状态和跳跃状态切换火柴人的图像（从姿势缓存中取）"""
+        key = (bool(self.is_jumping), self.jump_direction, bool(self.is_sprinting), bool(self.facing_right))
+        image = Player.pose_cache.get(key)
+        if image is None:
+            image = Player.render_pose(*key)
+            Player.pose_cache[key] = image
+        self.image = image
+    
+    @classmethod
+    def build_pose_cache(cls):
+        """预先绘制所有 (跳跃, 跳跃方向, 奔跑, 朝向) 组合的姿势"""
+        for is_jumping in (False, True):
+            for jump_direction in (-1, 0, 1):
+                for is_sprinting in (False, True):
+                    for facing_right in (False, True):
+                        key = (is_jumping, jump_direction, is_sprinting, facing_right)
+                        cls.pose_cache[key] = cls.render_pose(*key)
+    
+    @staticmethod
+    def render_pose(is_jumping, jump_direction, is_sprinting, facing_right):
+        """绘制一种姿势的火柴人图像"""
         # 创建角色表面
-        self.image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+        image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
         
         # 定义颜色
         HEAD_COLOR = (0, 0, 0)        # 黑色头部
@@ -199,32 +197,32 @@ class Player(pygame.sprite.Sprite):
         head_radius = 6
         
         # 绘制头部 (圆形)
-        pygame.draw.circle(self.image, HEAD_COLOR, (center_x, head_radius + 2), head_radius)
+        pygame.draw.circle(image, HEAD_COLOR, (center_x, head_radius + 2), head_radius)
         
         # 绘制身体 (线条)
         body_start = (center_x, head_radius * 2 + 2)  # 从头部下方开始
         body_end = (center_x, PLAYER_HEIGHT // 2 + 5)  # 身体长度
-        pygame.draw.line(self.image, BODY_COLOR, body_start, body_end, 2)
+        pygame.draw.line(image, BODY_COLOR, body_start, body_end, 2)
         
         # 根据状态绘制不同的火柴人
-        if self.is_jumping:
+        if is_jumping:
             # 跳跃状态：根据跳跃方向显示不同动作
             # 绘制手臂（跳跃姿态，向上收起）
             arm_start = body_start
             arm_end_left = (center_x - 7, PLAYER_HEIGHT // 2 - 10)
             arm_end_right = (center_x + 7, PLAYER_HEIGHT // 2 - 10)
-            pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_left, 2)
-            pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_right, 2)
+            pygame.draw.line(image, LIMB_COLOR, arm_start, arm_end_left, 2)
+            pygame.draw.line(image, LIMB_COLOR, arm_start, arm_end_right, 2)
             
             # 绘制腿（跳跃姿态，根据方向调整姿势）
             leg_start = body_end
             
-            if self.jump_direction == -1:  # 向左跳跃
+            if jump_direction == -1:  # 向左跳跃
                 # 左腿向前（左侧）
                 leg_end_left = (center_x - 12, PLAYER_HEIGHT // 2 + 10)
                 # 右腿向后（右侧）
                 leg_end_right = (center_x + 10, PLAYER_HEIGHT - 5)
-            elif self.jump_direction == 1:  # 向右跳跃
+            elif jump_direction == 1:  # 向右跳跃
                 # 左腿向后（左侧）
                 leg_end_left = (center_x - 10, PLAYER_HEIGHT - 5)
                 # 右腿向前（右侧）
@@ -235,14 +233,14 @@ class Player(pygame.sprite.Sprite):
                 # 右腿向下
                 leg_end_right = (center_x + 8, PLAYER_HEIGHT - 2)
             
-            pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_left, 2)
-            pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_right, 2)
-        elif self.is_sprinting:
+            pygame.draw.line(image, LIMB_COLOR, leg_start, leg_end_left, 2)
+            pygame.draw.line(image, LIMB_COLOR, leg_start, leg_end_right, 2)
+        elif is_sprinting:
             # 奔跑状态：手臂和腿部呈奔跑姿态
             # 绘制手臂（奔跑姿态，向前后摆动）
             arm_start = body_start
             # 前臂（与移动方向相反）
-            if self.facing_right:
+            if facing_right:
                 # 向右移动时，右臂向前
                 arm_end_front = (center_x + 10, PLAYER_HEIGHT // 2 - 2)
                 arm_end_back = (center_x - 10, PLAYER_HEIGHT // 2)
@@ -250,32 +248,34 @@ class Player(pygame.sprite.Sprite):
                 # 向左移动时，左臂向前
                 arm_end_front = (center_x - 10, PLAYER_HEIGHT // 2 - 2)
                 arm_end_back = (center_x + 10, PLAYER_HEIGHT // 2)
-            pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_front, 2)
-            pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_back, 2)
+            pygame.draw.line(image, LIMB_COLOR, arm_start, arm_end_front, 2)
+            pygame.draw.line(image, LIMB_COLOR, arm_start, arm_end_back, 2)
             
             # 绘制腿（奔跑姿态，一前一后）
             leg_start = body_end
             # 前腿（与移动方向相同）
-            if self.facing_right:
+            if facing_right:
                 leg_end_front = (center_x + 8, PLAYER_HEIGHT - 8)
                 leg_end_back = (center_x - 8, PLAYER_HEIGHT - 2)
             else:
                 leg_end_front = (center_x - 8, PLAYER_HEIGHT - 8)
                 leg_end_back = (center_x + 8, PLAYER_HEIGHT - 2)
-            pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_front, 2)
-            pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_back, 2)
+            pygame.draw.line(image, LIMB_COLOR, leg_start, leg_end_front, 2)
+            pygame.draw.line(image, LIMB_COLOR, leg_start, leg_end_back, 2)
         else:
             # 正常状态：手臂和腿部呈常规姿态
             # 绘制手臂
             arm_start = body_start
             arm_end_left = (center_x - 8, PLAYER_HEIGHT // 2 - 5)
             arm_end_right = (center_x + 8, PLAYER_HEIGHT // 2 - 5)
-            pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_left, 2)
-            pygame.draw.line(self.image, LIMB_COLOR, arm_start, arm_end_right, 2)
+            pygame.draw.line(image, LIMB_COLOR, arm_start, arm_end_left, 2)
+            pygame.draw.line(image, LIMB_COLOR, arm_start, arm_end_right, 2)
             
             # 绘制腿
             leg_start = body_end
             leg_end_left = (center_x - 6, PLAYER_HEIGHT - 5)
             leg_end_right = (center_x + 6, PLAYER_HEIGHT - 5)
-            pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_left, 2)
-            pygame.draw.line(self.image, LIMB_COLOR, leg_start, leg_end_right, 2)
\ No newline at end of file
+            pygame.draw.line(image, LIMB_COLOR, leg_start, leg_end_left, 2)
+            pygame.draw.line(image, LIMB_COLOR, leg_start, leg_end_right, 2)
+        
+        return image
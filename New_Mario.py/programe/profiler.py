@@ -0,0 +1,74 @@
+# profiler.py - 逐帧分阶段计时，支持叠加显示和导出CSV
+# -*- coding: utf-8 -*-
+import csv
+import time
+from array import array
+from constants import *
+
+# Game.run 每帧依次经过的阶段
+PROFILE_PHASES = ['events', 'input', 'arrows', 'sprites', 'collision', 'score', 'generation', 'camera', 'draw', 'flip']
+
+
+class FrameProfiler:
+    """用环形缓冲区保存最近若干帧每个阶段的耗时（毫秒）"""
+
+    def __init__(self, phases=PROFILE_PHASES, capacity=PROFILE_HISTORY):
+        self.phases = list(phases)
+        self.capacity = capacity
+        self.samples = {phase: array('d', [0.0]) * capacity for phase in self.phases}
+        self.index = 0  # 下一帧写入的位置
+        self.count = 0  # 缓冲区中有效的帧数
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.last_time = time.perf_counter()
+
+    def begin_frame(self):
+        for phase in self.phases:
+            self.current[phase] = 0.0
+        self.last_time = time.perf_counter()
+
+    def mark(self, phase):
+        """把上一次标记以来的耗时记到指定阶段上"""
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_time
+        self.last_time = now
+
+    def end_frame(self):
+        for phase in self.phases:
+            self.samples[phase][self.index] = self.current[phase] * 1000.0
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def history(self, phase):
+        """按时间顺序返回某阶段的历史耗时"""
+        samples = self.samples[phase]
+        if self.count < self.capacity:
+            return samples[:self.count]
+        return samples[self.index:] + samples[:self.index]
+
+    def percentile(self, phase, percent):
+        values = sorted(self.history(phase))
+        if not values:
+            return 0.0
+        position = min(len(values) - 1, int(len(values) * percent / 100.0))
+        return values[position]
+
+    def summary(self):
+        """返回每个阶段的 (p50, p99)"""
+        return {phase: (self.percentile(phase, 50), self.percentile(phase, 99)) for phase in self.phases}
+
+    def write_csv(self, path):
+        """导出缓冲区中所有帧的分阶段耗时"""
+        columns = [self.history(phase) for phase in self.phases]
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + [f'{phase}_ms' for phase in self.phases])
+            for frame, row in enumerate(zip(*columns)):
+                writer.writerow([frame] + [f'{value:.4f}' for value in row])
+
+    def overlay_lines(self, sprite_counts):
+        """生成叠加显示的文字行"""
+        lines = [f'{"phase":<11}{"p50":>8}{"p99":>8}']
+        for phase, (p50, p99) in self.summary().items():
+            lines.append(f'{phase:<11}{p50:>8.3f}{p99:>8.3f}')
+        lines.append('  '.join(f'{name}:{count}' for name, count in sprite_counts.items()))
+        return lines
@@ -0,0 +1,92 @@
+# replay.py - 输入录制和快速回放
+# -*- coding: utf-8 -*-
+import struct
+import sys
+import time
+
+# 录像文件格式：文件头 + 若干 (输入位掩码, 连续帧数) 的游程记录
+RECORDING_MAGIC = b'MREC'
+RECORDING_VERSION = 2  # 背景不再从游戏随机数中取值，旧录像的随机序列对不上
+HEADER_FORMAT = '<4sHQI'  # 标识, 版本, 随机种子, 游程数量
+RUN_FORMAT = '<BH'        # 输入位掩码, 连续帧数
+MAX_RUN_LENGTH = 0xFFFF
+
+
+class InputRecorder:
+    """逐帧记录输入位掩码，相同的连续输入合并为一条游程记录"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.runs = []  # [输入位掩码, 连续帧数]
+
+    def record(self, flags):
+        if self.runs and self.runs[-1][0] == flags and self.runs[-1][1] < MAX_RUN_LENGTH:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([flags, 1])
+
+    @property
+    def frame_count(self):
+        return sum(count for flags, count in self.runs)
+
+    def frames(self):
+        """展开成逐帧的输入位掩码列表，可以直接传给 Game.step"""
+        frames = []
+        for flags, count in self.runs:
+            frames.extend([flags] * count)
+        return frames
+
+    def to_bytes(self):
+        data = bytearray(struct.pack(HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION, self.seed, len(self.runs)))
+        for flags, count in self.runs:
+            data += struct.pack(RUN_FORMAT, flags, count)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, run_count = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError("不是有效的录像文件")
+        recorder = cls(seed)
+        offset = struct.calcsize(HEADER_FORMAT)
+        for flags, count in struct.iter_unpack(RUN_FORMAT, data[offset:offset + run_count * struct.calcsize(RUN_FORMAT)]):
+            recorder.runs.append([flags, count])
+        return recorder
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def replay(recording, game=None):
+    """在无窗口模式下按录像重新模拟整局游戏，返回模拟结束后的 Game"""
+    from game import Game
+
+    if game is None:
+        game = Game(headless=True, seed=recording.seed)
+    game.step(recording.frame_count, recording.frames())
+    return game
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python replay.py 录像文件")
+        return
+
+    recording = InputRecorder.load(sys.argv[1])
+    start = time.perf_counter()
+    game = replay(recording)
+    elapsed = time.perf_counter() - start
+
+    frames = recording.frame_count
+    print(f"种子: {recording.seed}  帧数: {frames}  用时: {elapsed:.3f}s  速度: {frames / max(elapsed, 1e-9):.0f} 帧/秒")
+    print(f"最终得分: {game.score}  玩家位置: {game.player.rect.topleft}  游戏结束: {game.game_over}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# snapshot.py - 把一局游戏的完整状态打包成紧凑的二进制数据，用于回滚、存档点重生和分支搜索
+# -*- coding: utf-8 -*-
+import struct
+from array import array
+import numpy as np
+from constants import *
+from brick_platform import BrickPlatform
+from coin import Coin
+
+# 快照格式：文件头 + 游戏状态 + 随机数状态 + 玩家 + 按 all_sprites 顺序排列的精灵 + 箭矢数组
+SNAPSHOT_MAGIC = b'MSNP'
+SNAPSHOT_VERSION = 2
+HEADER_FORMAT = struct.Struct('<4sH')  # 标识, 版本
+# 得分, 最高高度, 摄像机x, 摄像机y, 游戏结束, 闪烁计时, 死因, 箭矢计时,
+# 已取出的最高位置, 关卡种子, 关卡起点, 下一块横带序号, 待放置的平台和金币数
+GAME_FORMAT = struct.Struct('<iiddBBBBiQiII')
+RNG_FORMAT = struct.Struct('<Bd')  # 是否有缓存的高斯随机数, 高斯随机数（MT 状态本身用 array 保存）
+RNG_WORDS = 625  # Mersenne Twister 的 624 个状态字 + 当前位置
+# x, y, 水平速度, 垂直速度, 剩余跳跃次数, 跳跃方向, 标志位
+PLAYER_FORMAT = struct.Struct('<iiddbbB')
+COUNT_FORMAT = struct.Struct('<I')
+# 类型, x, y, 宽, 高, 标志位, 移动方向, 金币角度
+SPRITE_FORMAT = struct.Struct('<BiiHHBbH')
+
+# 精灵类型
+SPRITE_PLAYER = 0
+SPRITE_PLATFORM = 1
+SPRITE_COIN = 2
+
+# 平台标志位
+PLATFORM_DEATH_GROUND = 1
+PLATFORM_SPIKES = 2
+PLATFORM_MOVING = 4
+
+# 玩家标志位
+PLAYER_ON_GROUND = 1
+PLAYER_FACING_RIGHT = 2
+PLAYER_JUMPING = 4
+PLAYER_SPRINTING = 8
+
+# 死因编码，下标即编码
+DEATH_CAUSES = (None, 'arrow', 'death_ground', 'spikes', 'fall')
+
+
+def pack_game(game):
+    """把 Game 的状态打包成 bytes"""
+    data = bytearray(HEADER_FORMAT.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+    data += GAME_FORMAT.pack(
+        game.score, game.max_height_reached, game.camera_offset_x, game.camera_offset_y,
+        game.game_over, game.restart_timer, DEATH_CAUSES.index(game.death_cause), game.arrow_spawn_timer,
+        game.generated_top, game.layout_seed, game.layout_start, game.next_chunk, len(game.pending_spawns))
+
+    version, words, gauss_next = game.rng.getstate()
+    data += array('I', words).tobytes()
+    data += RNG_FORMAT.pack(gauss_next is not None, gauss_next or 0.0)
+
+    player = game.player
+    flags = ((player.on_ground and PLAYER_ON_GROUND) | (player.facing_right and PLAYER_FACING_RIGHT) |
+             (player.is_jumping and PLAYER_JUMPING) | (player.is_sprinting and PLAYER_SPRINTING))
+    data += PLAYER_FORMAT.pack(player.rect.x, player.rect.y, player.vel_x, player.vel_y,
+                               player.jumps_remaining, player.jump_direction, flags)
+
+    # 精灵按 all_sprites 中的顺序保存，恢复后更新顺序和碰撞顺序都不变
+    sprites = game.all_sprites.sprites()
+    data += COUNT_FORMAT.pack(len(sprites))
+    for sprite in sprites:
+        rect = sprite.rect
+        if sprite is player:
+            data += SPRITE_FORMAT.pack(SPRITE_PLAYER, 0, 0, 0, 0, 0, 0, 0)
+        elif isinstance(sprite, BrickPlatform):
+            flags = ((sprite.platform_type == DEATH_GROUND and PLATFORM_DEATH_GROUND) |
+                     (sprite.has_spikes and PLATFORM_SPIKES) | (sprite.is_moving and PLATFORM_MOVING))
+            direction = sprite.move_direction if sprite.is_moving else 0
+            data += SPRITE_FORMAT.pack(SPRITE_PLATFORM, rect.x, rect.y, sprite.width, sprite.height,
+                                       flags, direction, 0)
+        else:
+            data += SPRITE_FORMAT.pack(SPRITE_COIN, rect.x, rect.y, 0, 0, 0, 0, sprite.angle)
+
+    arrows = game.arrows
+    n = arrows.count
+    data += COUNT_FORMAT.pack(n)
+    for values in (arrows.x, arrows.y, arrows.speed, arrows.previous_y):
+        data += values[:n].tobytes()
+    return bytes(data)
+
+
+def unpack_game(game, data):
+    """把 pack_game 打包的状态恢复到 Game 上"""
+    magic, version = HEADER_FORMAT.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("不是有效的快照数据")
+    offset = HEADER_FORMAT.size
+
+    (game.score, game.max_height_reached, game.camera_offset_x, game.camera_offset_y,
+     game_over, game.restart_timer, cause, game.arrow_spawn_timer,
+     generated_top, layout_seed, layout_start, next_chunk, pending) = GAME_FORMAT.unpack_from(data, offset)
+    offset += GAME_FORMAT.size
+    game.game_over = bool(game_over)
+    game.death_cause = DEATH_CAUSES[cause]
+
+    # 关卡布局不同时按快照中的关卡种子重建生成器，之后的横带从缓存或生成器中接着取
+    if layout_seed != game.layout_seed or layout_start != game.layout_start:
+        game.new_layout(layout_seed, layout_start)
+    game.level_chunks = game.cached_chunks(next_chunk)
+    game.next_chunk = next_chunk
+    game.generated_top = generated_top
+    game.pending_spawns.clear()
+    game.pending_spawns.extend(pending_specs(game, next_chunk, pending))
+
+    words = array('I')
+    words.frombytes(data[offset:offset + RNG_WORDS * words.itemsize])
+    offset += RNG_WORDS * words.itemsize
+    has_gauss, gauss_next = RNG_FORMAT.unpack_from(data, offset)
+    offset += RNG_FORMAT.size
+    game.rng.setstate((3, tuple(words), gauss_next if has_gauss else None))
+
+    player = game.player
+    (player.rect.x, player.rect.y, player.vel_x, player.vel_y,
+     player.jumps_remaining, player.jump_direction, flags) = PLAYER_FORMAT.unpack_from(data, offset)
+    offset += PLAYER_FORMAT.size
+    player.on_ground = bool(flags & PLAYER_ON_GROUND)
+    player.facing_right = bool(flags & PLAYER_FACING_RIGHT)
+    player.is_jumping = bool(flags & PLAYER_JUMPING)
+    player.is_sprinting = bool(flags & PLAYER_SPRINTING)
+    player.update_sprite_image()
+
+    count, = COUNT_FORMAT.unpack_from(data, offset)
+    offset += COUNT_FORMAT.size
+    end = offset + count * SPRITE_FORMAT.size
+    records = list(SPRITE_FORMAT.iter_unpack(data[offset:end]))
+    offset = end
+    restore_sprites(game, records)
+
+    arrows = game.arrows
+    n, = COUNT_FORMAT.unpack_from(data, offset)
+    offset += COUNT_FORMAT.size
+    arrows.clear()
+    while len(arrows.x) < n:
+        arrows.grow()
+    for values in (arrows.x, arrows.y, arrows.speed, arrows.previous_y):
+        size = n * values.itemsize
+        values[:n] = np.frombuffer(data, dtype=values.dtype, count=n, offset=offset)
+        offset += size
+    arrows.count = n
+
+    # 绘制插值从恢复后的位置开始
+    game.previous_camera = (game.camera_offset_x, game.camera_offset_y)
+    game.previous_positions = {}
+
+
+def pending_specs(game, next_chunk, count):
+    """待放置队列总是已取出横带的最后 count 个平台和金币，从最后一块横带往前找回它们"""
+    if not count:
+        return []
+    tail = []
+    index = next_chunk
+    while len(tail) < count:
+        index -= 1
+        chunk = game.layout_chunk(index)
+        tail[:0] = chunk.platforms + chunk.coins
+    return tail[len(tail) - count:]
+
+
+def sprite_matches(game, sprite, kind, width, height, flags):
+    """现有精灵能否直接移动到快照记录的位置（类型、尺寸都相同），恢复时每个精灵都要比较，直接比较属性"""
+    if kind == SPRITE_PLATFORM:
+        return (isinstance(sprite, BrickPlatform) and sprite.width == width and sprite.height == height and
+                (sprite.platform_type == DEATH_GROUND) == bool(flags & PLATFORM_DEATH_GROUND) and
+                sprite.has_spikes == bool(flags & PLATFORM_SPIKES))
+    if kind == SPRITE_PLAYER:
+        return sprite is game.player
+    return isinstance(sprite, Coin)
+
+
+def restore_sprites(game, records):
+    """按快照记录恢复 all_sprites 中的精灵及其顺序
+
+    回滚几帧时精灵基本不变，所以先逐个比较：前面能对上的精灵原地移动，
+    从第一个对不上的精灵开始才回收到对象池并重新创建
+    """
+    current = game.all_sprites.sprites()
+    kept = 0
+    for sprite, (kind, x, y, width, height, flags, direction, angle) in zip(current, records):
+        if not sprite_matches(game, sprite, kind, width, height, flags):
+            break
+        kept += 1
+        if kind == SPRITE_PLATFORM:
+            moving = bool(flags & PLATFORM_MOVING)
+            if sprite.is_moving != moving:
+                sprite.set_moving(moving)
+            if moving:
+                sprite.move_direction = direction
+        elif kind == SPRITE_COIN:
+            sprite.angle = angle
+        # 位置没变的精灵不需要更新空间索引
+        if kind != SPRITE_PLAYER and (sprite.rect.x != x or sprite.rect.y != y):
+            sprite.rect.x = x
+            sprite.rect.y = y
+            for group in sprite.groups():
+                if hasattr(group, 'relocate'):
+                    group.relocate(sprite)
+
+    for sprite in current[kept:]:
+        if isinstance(sprite, BrickPlatform):
+            game.retire_platform(sprite)
+        elif isinstance(sprite, Coin):
+            game.retire_coin(sprite)
+        else:
+            game.all_sprites.remove(sprite)
+
+    for kind, x, y, width, height, flags, direction, angle in records[kept:]:
+        if kind == SPRITE_PLAYER:
+            game.all_sprites.add(game.player)
+        elif kind == SPRITE_PLATFORM:
+            platform_type = DEATH_GROUND if flags & PLATFORM_DEATH_GROUND else PLATFORM
+            platform = game.make_platform(x, y, width, height, platform_type,
+                                          bool(flags & PLATFORM_SPIKES), bool(flags & PLATFORM_MOVING))
+            if platform.is_moving:
+                platform.move_direction = direction
+            if platform_type == DEATH_GROUND:
+                game.ground = platform
+        else:
+            coin = game.make_coin(x, y)
+            coin.angle = angle
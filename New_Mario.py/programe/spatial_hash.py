@@ -0,0 +1,100 @@
+# spatial_hash.py - 均匀网格空间哈希，用于加速碰撞查询
+# -*- coding: utf-8 -*-
+import pygame
+from constants import *
+
+
+class SpatialHash:
+    """把精灵按矩形覆盖的网格单元登记，查询时只检查附近几个单元"""
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}         # (cx, cy) -> {sprite: None}
+        self.sprite_cells = {}  # sprite -> 该精灵占据的单元列表
+        self.order = {}         # sprite -> 插入序号，保证查询结果顺序稳定
+        self.next_order = 0
+
+    def cells_for(self, rect):
+        """计算矩形覆盖的所有网格单元"""
+        size = self.cell_size
+        x0 = rect.left // size
+        x1 = (rect.right - 1) // size
+        y0 = rect.top // size
+        y1 = (rect.bottom - 1) // size
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def insert(self, sprite):
+        if sprite in self.sprite_cells:
+            return
+        cells = self.cells_for(sprite.rect)
+        for cell in cells:
+            self.cells.setdefault(cell, {})[sprite] = None
+        self.sprite_cells[sprite] = cells
+        self.order[sprite] = self.next_order
+        self.next_order += 1
+
+    def remove(self, sprite):
+        cells = self.sprite_cells.pop(sprite, None)
+        if cells is None:
+            return
+        for cell in cells:
+            bucket = self.cells[cell]
+            del bucket[sprite]
+            if not bucket:
+                del self.cells[cell]
+        del self.order[sprite]
+
+    def move(self, sprite):
+        """精灵移动后更新其所在单元，单元没变时不做任何事"""
+        old_cells = self.sprite_cells.get(sprite)
+        if old_cells is None:
+            return
+        new_cells = self.cells_for(sprite.rect)
+        if new_cells == old_cells:
+            return
+        for cell in old_cells:
+            bucket = self.cells[cell]
+            del bucket[sprite]
+            if not bucket:
+                del self.cells[cell]
+        for cell in new_cells:
+            self.cells.setdefault(cell, {})[sprite] = None
+        self.sprite_cells[sprite] = new_cells
+
+    def query(self, rect):
+        """返回与矩形所在单元有交集的候选精灵（按插入顺序）"""
+        found = {}
+        for cell in self.cells_for(rect):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return sorted(found, key=self.order.__getitem__)
+
+    def clear(self):
+        self.cells.clear()
+        self.sprite_cells.clear()
+        self.order.clear()
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """带空间哈希索引的精灵组，加入和移除精灵时自动维护索引"""
+
+    def __init__(self, *sprites, cell_size=SPATIAL_CELL_SIZE):
+        self.index = SpatialHash(cell_size)
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.index.insert(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.index.remove(sprite)
+
+    def relocate(self, sprite):
+        """精灵位置改变后调用，更新索引"""
+        self.index.move(sprite)
+
+    def collide(self, rect):
+        """返回与矩形相交的精灵，相当于对整个组调用 spritecollide"""
+        return [sprite for sprite in self.index.query(rect) if rect.colliderect(sprite.rect)]
@@ -0,0 +1,56 @@
+# texture_cache.py - 带引用计数的共享纹理缓存
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from constants import *
+
+
+class TextureCache:
+    """按键共享纹理，第一次用到时才调用 render(*key) 绘制
+
+    正在被精灵使用的纹理按引用计数保留；没有精灵使用的纹理按最近使用顺序
+    最多保留 max_idle 张，超出时淘汰最久未用的
+    """
+
+    def __init__(self, render, max_idle=TEXTURE_CACHE_SIZE):
+        self.render = render
+        self.max_idle = max_idle
+        self.textures = {}  # 键 -> 纹理
+        self.refs = {}  # 键 -> 使用中的精灵数
+        self.idle = OrderedDict()  # 没有精灵使用的纹理键，按最近使用排序
+
+    def get(self, key):
+        """取得纹理但不占用，用于提前绘制"""
+        texture = self.textures.get(key)
+        if texture is None:
+            texture = self.render(*key)
+            self.textures[key] = texture
+            if key not in self.refs:
+                self.idle[key] = None
+                self.evict()
+        elif key in self.idle:
+            self.idle.move_to_end(key)
+        return texture
+
+    def acquire(self, key):
+        """取得纹理并占用，不再使用时必须调用 release"""
+        texture = self.get(key)
+        self.refs[key] = self.refs.get(key, 0) + 1
+        self.idle.pop(key, None)
+        return texture
+
+    def release(self, key):
+        count = self.refs[key] - 1
+        if count:
+            self.refs[key] = count
+        else:
+            del self.refs[key]
+            self.idle[key] = None
+            self.evict()
+
+    def evict(self):
+        while len(self.idle) > self.max_idle:
+            key, _ = self.idle.popitem(last=False)
+            del self.textures[key]
+
+    def __len__(self):
+        return len(self.textures)
@@ -0,0 +1,152 @@
+# vec_env.py - 同时推进多局无窗口游戏的向量化环境，供强化学习训练使用
+# -*- coding: utf-8 -*-
+import random
+import numpy as np
+import pygame
+from constants import *
+from frame_input import INPUT_LEFT, INPUT_RIGHT, INPUT_SPRINT, INPUT_JUMP
+
+# 动作就是 frame_input.py 中的输入位掩码，只取移动、奔跑和跳跃四位，共 16 种组合
+ACTION_MASK = INPUT_LEFT | INPUT_RIGHT | INPUT_SPRINT | INPUT_JUMP
+ACTION_COUNT = ACTION_MASK + 1
+
+# 观测向量：玩家状态 + 最近的若干块平台 + 最近的若干支箭矢，不足的位置补零
+OBS_PLATFORMS = 8
+OBS_ARROWS = 4
+PLAYER_FEATURES = 6    # 屏幕x, 屏幕y, 水平速度, 垂直速度, 剩余跳跃次数, 距尖刺地面的高度
+PLATFORM_FEATURES = 6  # 是否存在, dx, dy, 宽度, 是否有尖刺, 是否移动
+ARROW_FEATURES = 3     # 是否存在, dx, dy
+OBS_SIZE = PLAYER_FEATURES + OBS_PLATFORMS * PLATFORM_FEATURES + OBS_ARROWS * ARROW_FEATURES
+
+
+class VecEnv:
+    """持有 N 局无窗口游戏，一次 step 用一批动作推进所有游戏
+
+    step 返回堆叠的观测、奖励（得分的增量）、结束标志和每局的附加信息。
+    某局结束后自动重开，并沿用该局已经生成的关卡布局，不重新生成关卡。
+    """
+
+    def __init__(self, num_envs, seed=None, frame_skip=1):
+        from game import Game
+
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.num_envs = num_envs
+        self.frame_skip = frame_skip
+        self.games = [Game(headless=True, seed=seed + i) for i in range(num_envs)]
+
+        self.observations = np.zeros((num_envs, OBS_SIZE), dtype=np.float32)
+        self.scores = np.zeros(num_envs, dtype=np.int64)  # 上一步结束时的得分
+        self.episode_returns = np.zeros(num_envs, dtype=np.int64)
+        self.episode_frames = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        """重开所有游戏，返回初始观测"""
+        for i in range(self.num_envs):
+            self.reset_env(i)
+        return self.observe()
+
+    def reset_env(self, i):
+        game = self.games[i]
+        game.restart_game(reuse_layout=True)
+        self.scores[i] = game.score
+        self.episode_returns[i] = 0
+        self.episode_frames[i] = 0
+
+    def step(self, actions):
+        """每局执行对应的动作 frame_skip 帧，返回 (观测, 奖励, 结束标志, 附加信息列表)
+
+        跳跃是按下类输入，只在重复的第一帧按下；结束的游戏在返回前自动重开，
+        结束时的观测放在附加信息的 'final_observation' 中
+        """
+        actions = np.asarray(actions, dtype=np.int64) & ACTION_MASK
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = [{} for _ in range(self.num_envs)]
+
+        for i, game in enumerate(self.games):
+            flags = int(actions[i])
+            for frame in range(self.frame_skip):
+                game.step(1, flags if frame == 0 else flags & ~INPUT_JUMP)
+                self.episode_frames[i] += 1
+                if game.game_over:
+                    break
+
+            reward = game.score - self.scores[i]
+            self.scores[i] = game.score
+            self.episode_returns[i] += reward
+            rewards[i] = reward
+
+            if game.game_over:
+                dones[i] = True
+                infos[i] = {
+                    'final_observation': self.observe_env(i).copy(),
+                    'score': game.score,
+                    'return': int(self.episode_returns[i]),
+                    'frames': int(self.episode_frames[i]),
+                    'cause': game.death_cause,
+                }
+                self.reset_env(i)
+
+        return self.observe(), rewards, dones, infos
+
+    def observe(self):
+        """返回所有游戏当前的观测，形状为 (num_envs, OBS_SIZE)"""
+        for i in range(self.num_envs):
+            self.observe_env(i)
+        return self.observations.copy()
+
+    def observe_env(self, i):
+        """把第 i 局游戏的观测写入 observations[i] 并返回该行"""
+        game = self.games[i]
+        player = game.player
+        rect = player.rect
+        obs = self.observations[i]
+        obs[:] = 0.0
+
+        # 玩家状态，坐标相对于摄像机
+        obs[0] = (rect.x - game.camera_offset_x) / SCREEN_WIDTH
+        obs[1] = (rect.y - game.camera_offset_y) / SCREEN_HEIGHT
+        obs[2] = player.vel_x / (PLAYER_SPEED * SPRINT_MULTIPLIER)
+        obs[3] = player.vel_y / abs(JUMP_STRENGTH)
+        obs[4] = player.jumps_remaining / player.max_jumps
+        obs[5] = (SCREEN_HEIGHT - 40 - rect.bottom) / SCREEN_HEIGHT
+        offset = PLAYER_FEATURES
+
+        # 以玩家为中心一屏范围内最近的平台（不含尖刺地面）
+        search = pygame.Rect(rect.centerx - SCREEN_WIDTH // 2, rect.centery - SCREEN_HEIGHT // 2,
+                             SCREEN_WIDTH, SCREEN_HEIGHT)
+        nearby = []
+        for platform in game.platforms.collide(search):
+            if platform.platform_type == DEATH_GROUND:
+                continue
+            dx = platform.rect.centerx - rect.centerx
+            dy = platform.rect.top - rect.bottom
+            nearby.append((dx * dx + dy * dy, dx, dy, platform))
+        nearby.sort(key=lambda item: item[0])
+        for slot, (distance, dx, dy, platform) in enumerate(nearby[:OBS_PLATFORMS]):
+            base = offset + slot * PLATFORM_FEATURES
+            obs[base] = 1.0
+            obs[base + 1] = dx / SCREEN_WIDTH
+            obs[base + 2] = dy / SCREEN_HEIGHT
+            obs[base + 3] = platform.rect.width / SCREEN_WIDTH
+            obs[base + 4] = platform.has_spikes
+            obs[base + 5] = platform.is_moving
+        offset += OBS_PLATFORMS * PLATFORM_FEATURES
+
+        # 最近的箭矢，直接在 ArrowField 的数组上计算距离
+        arrows = game.arrows
+        n = len(arrows)
+        if n:
+            dx = arrows.x[:n] + arrows.arrow_width // 2 - rect.centerx
+            dy = arrows.y[:n] + arrows.arrow_height - rect.top  # 箭矢底端相对玩家头顶
+            order = np.argsort(dx * dx + dy * dy, kind='stable')[:OBS_ARROWS]
+            count = len(order)
+            slots = obs[offset:offset + count * ARROW_FEATURES].reshape(count, ARROW_FEATURES)
+            slots[:, 0] = 1.0
+            slots[:, 1] = dx[order] / SCREEN_WIDTH
+            slots[:, 2] = dy[order] / SCREEN_HEIGHT
+        return obs
+
+    def close(self):
+        self.games = []
@@ -1,6 +1,108 @@
 # sprite_loader.py - 精灵加载工具
 import pygame
 import os
+from collections import OrderedDict
+
+# 精灵表缓存默认最多占用的像素内存（字节）
+SPRITE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def frame_view(sheet, rect):
+    """精灵表中 rect 范围的图像：完全在精灵表内时返回共享像素的子表面，
+    超出精灵表时与直接 blit 一样裁剪，超出的部分保持透明，只能复制"""
+    rect = pygame.Rect(rect)
+    if sheet.get_rect().contains(rect):
+        return sheet.subsurface(rect)
+    image = pygame.Surface(rect.size, pygame.SRCALPHA)
+    image.blit(sheet, (0, 0), rect)
+    return image
+
+
+class SpriteSheetCache:
+    """进程内共享的精灵表缓存：每张精灵表只解码一次，按最近使用顺序淘汰，总像素内存不超过 max_bytes
+
+    切出的帧是共享精灵表像素的子表面，不复制像素，同样的切法也会缓存起来；
+    修改帧会同时修改精灵表，需要修改时请先 copy()。
+    被淘汰的精灵表如果还有帧在使用，像素要等这些帧释放后才会回收
+    """
+
+    def __init__(self, max_bytes=SPRITE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # 路径 -> [精灵表, 字节数, {切法: 帧列表}]
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def entry(self, path):
+        key = os.path.abspath(path)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        sheet = pygame.image.load(key)
+        # 已创建窗口时转换成显示格式，加快绘制
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert_alpha()
+        size = sheet.get_pitch() * sheet.get_height()
+        entry = [sheet, size, {}]
+        self.entries[key] = entry
+        self.resident_bytes += size
+        self.evict()
+        return entry
+
+    def load(self, path):
+        """取得精灵表（共享的表面，不要修改）"""
+        return self.entry(path)[0]
+
+    def frames(self, path, sprite_width, sprite_height, num_sprites=None):
+        """横向排列的精灵帧（共享精灵表像素的子表面，超出精灵表的帧是裁剪后的副本）"""
+        sheet, size, frame_lists = self.entry(path)
+        key = (sprite_width, sprite_height, num_sprites)
+        frames = frame_lists.get(key)
+        if frames is None:
+            if num_sprites is None:
+                num_sprites = sheet.get_width() // sprite_width
+            frames = [frame_view(sheet, (i * sprite_width, 0, sprite_width, sprite_height))
+                      for i in range(num_sprites)]
+            frame_lists[key] = frames
+        return frames
+
+    def evict(self):
+        """超出内存上限时淘汰最久未用的精灵表，最近用到的一张总是保留"""
+        while self.resident_bytes > self.max_bytes and len(self.entries) > 1:
+            key, entry = self.entries.popitem(last=False)
+            self.resident_bytes -= entry[1]
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.resident_bytes = 0
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def stats(self):
+        """命中率和内存占用，用于确定合适的 max_bytes"""
+        return {
+            'sheets': len(self.entries),
+            'resident_bytes': self.resident_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+
+# 所有调用者共用的缓存
+sprite_cache = SpriteSheetCache()
+
 
 def load_sprite_sheet(sheet_path, sprite_width, sprite_height, num_sprites=None):
     """
@@ -9,21 +111,11 @@ def load_sprite_sheet(sheet_path, sprite_width, sprite_height, num_sprites=None)
     :param sprite_width: 单个精灵宽度
     :param sprite_height: 单个精灵高度
     :param num_sprites: 要加载的精灵数量，None表示加载全部
-    :return: 精灵列表
+    :return: 精灵列表（共享精灵表像素的子表面，需要修改时请先 copy()）
     """
     if not os.path.exists(sheet_path):
         print(f"精灵表不存在: {sheet_path}")
         return []
-    
-    sheet = pygame.image.load(sheet_path).convert_alpha()
-    sprites = []
-    
-    if num_sprites is None:
-        num_sprites = sheet.get_width() // sprite_width
-    
-    for i in range(num_sprites):
-        sprite = pygame.Surface((sprite_width, sprite_height), pygame.SRCALPHA)
-        sprite.blit(sheet, (0, 0), (i * sprite_width, 0, sprite_width, sprite_height))
-        sprites.append(sprite)
-    
-    return sprites
\ No newline at end of file
+
+    # 返回列表的副本，调用者增删元素不影响缓存
+    return list(sprite_cache.frames(sheet_path, sprite_width, sprite_height, num_sprites))
@@ -1,19 +1,16 @@
 # sprite_sheet.py - 精灵表切割工具
 import pygame
 import os
+from sprite_loader import sprite_cache, frame_view
 
 class SpriteSheet:
     def __init__(self, filename):
-        """加载精灵表"""
-        self.sprite_sheet = pygame.image.load(filename).convert_alpha()
+        """加载精灵表，同一张精灵表在所有 SpriteSheet 之间共享，只解码一次"""
+        self.sprite_sheet = sprite_cache.load(filename)
     
     def get_image(self, x, y, width, height):
-        """从精灵表中提取单个精灵图像"""
-        # 创建一个新的透明表面
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        # 从精灵表复制指定区域到新表面
-        image.blit(self.sprite_sheet, (0, 0), (x, y, width, height))
-        return image
+        """从精灵表中提取单个精灵图像（在精灵表内时是共享像素的子表面，需要修改时请先 copy()）"""
+        return frame_view(self.sprite_sheet, (x, y, width, height))
     
     def get_strip(self, x, y, width, height, count):
         """获取一系列精灵图像（如一个动画序列）"""
@@ -0,0 +1,195 @@
+# texture_atlas.py - 纹理图集：离线把资源包中的小图打包成几张大图，运行时按名字取出区域
+import argparse
+import json
+import os
+import re
+
+import pygame
+
+# 默认打包的资源目录（相对于 New_Mario.py）和图集输出目录
+ASSET_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "New_Mario.py")
+ASSET_PACKS = ("Free", "Main Characters")
+ATLAS_DIR = os.path.join(ASSET_ROOT, "atlas")
+INDEX_NAME = "atlas.json"
+ATLAS_VERSION = 1
+
+ATLAS_SIZE = 2048  # 每张图集的最大宽高，比它大的图片单独占一张
+PADDING = 1  # 图片之间留出的透明像素，缩放绘制时不会混入相邻图片
+
+# 文件名中的帧尺寸，例如 "Run (32x32).png"
+FRAME_SIZE_PATTERN = re.compile(r"\((\d+)x(\d+)\)")
+
+
+def find_images(root, packs=ASSET_PACKS):
+    """
+    查找资源包中的所有PNG
+    :return: [(名字, 文件路径)]，名字是相对于 root 的路径（用 / 分隔，不含扩展名）
+    """
+    images = []
+    for pack in packs:
+        for directory, _, files in os.walk(os.path.join(root, pack)):
+            for file in files:
+                if file.lower().endswith(".png"):
+                    path = os.path.join(directory, file)
+                    name = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, "/")
+                    images.append((name, path))
+    images.sort()
+    return images
+
+
+class ShelfPacker:
+    """按行（货架）装箱：图片按高度从高到低依次放入第一个放得下的行，放不下时开新行或新图集"""
+
+    def __init__(self, size=ATLAS_SIZE, padding=PADDING):
+        self.size = size
+        self.padding = padding
+        # 每张图集：{'width': 已用宽度, 'height': 已用高度, 'shelves': [[行顶部y, 行高, 已用宽度]]}，单独占一张的图片 shelves 为 None
+        self.sheets = []
+
+    def place(self, width, height):
+        """为 width x height 的图片找位置，返回 (图集序号, x, y)"""
+        w = width + self.padding
+        h = height + self.padding
+
+        # 比图集还大的图片单独占一张
+        if w > self.size or h > self.size:
+            self.sheets.append({'width': width, 'height': height, 'shelves': None})
+            return len(self.sheets) - 1, 0, 0
+
+        for index, sheet in enumerate(self.sheets):
+            if sheet['shelves'] is None:
+                continue
+            for shelf in sheet['shelves']:
+                if h <= shelf[1] and shelf[2] + w <= self.size:
+                    x = shelf[2]
+                    shelf[2] += w
+                    sheet['width'] = max(sheet['width'], shelf[2])
+                    return index, x, shelf[0]
+            if sheet['height'] + h <= self.size:
+                y = sheet['height']
+                sheet['shelves'].append([y, h, w])
+                sheet['height'] += h
+                sheet['width'] = max(sheet['width'], w)
+                return index, 0, y
+
+        self.sheets.append({'width': w, 'height': h, 'shelves': [[0, h, w]]})
+        return len(self.sheets) - 1, 0, 0
+
+
+def build_atlas(root=ASSET_ROOT, output_dir=ATLAS_DIR, packs=ASSET_PACKS, size=ATLAS_SIZE):
+    """
+    把资源包中的所有图片打包成图集，写出图集PNG和索引 atlas.json
+    :return: 索引数据
+    """
+    images = [(name, pygame.image.load(path)) for name, path in find_images(root, packs)]
+
+    # 按高度从高到低装箱，同样高度的宽的优先
+    packer = ShelfPacker(size)
+    placements = {}
+    for name, image in sorted(images, key=lambda item: (-item[1].get_height(), -item[1].get_width(), item[0])):
+        placements[name] = packer.place(*image.get_size())
+
+    sheets = [pygame.Surface((sheet['width'], sheet['height']), pygame.SRCALPHA) for sheet in packer.sheets]
+    regions = {}
+    for name, image in images:
+        index, x, y = placements[name]
+        sheets[index].blit(image, (x, y))
+        width, height = image.get_size()
+        region = {'sheet': index, 'rect': [x, y, width, height]}
+
+        # 文件名带帧尺寸的是横向排列的动画帧
+        match = FRAME_SIZE_PATTERN.search(os.path.basename(name))
+        if match:
+            region['frame'] = [int(match.group(1)), int(match.group(2))]
+        regions[name] = region
+
+    os.makedirs(output_dir, exist_ok=True)
+    sheet_files = []
+    for index, sheet in enumerate(sheets):
+        sheet_file = f"atlas_{index}.png"
+        pygame.image.save(sheet, os.path.join(output_dir, sheet_file))
+        sheet_files.append(sheet_file)
+
+    index_data = {'version': ATLAS_VERSION, 'sheets': sheet_files, 'regions': regions}
+    with open(os.path.join(output_dir, INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump(index_data, f, ensure_ascii=False, indent=1)
+    return index_data
+
+
+class TextureAtlas:
+    """运行时的图集：启动时只加载几张图集，按名字取出区域
+
+    region 返回 (图集, 矩形)，可以直接 screen.blit(图集, 位置, 矩形)；
+    image 和 frames 返回共享图集像素的子表面，不复制像素
+    """
+
+    def __init__(self, directory=ATLAS_DIR):
+        with open(os.path.join(directory, INDEX_NAME), encoding="utf-8") as f:
+            index_data = json.load(f)
+        if index_data.get('version') != ATLAS_VERSION:
+            raise ValueError(f"图集版本不匹配，请重新运行 texture_atlas.py: {directory}")
+
+        self.sheets = []
+        for sheet_file in index_data['sheets']:
+            sheet = pygame.image.load(os.path.join(directory, sheet_file))
+            # 已创建窗口时转换成显示格式，加快绘制
+            if pygame.display.get_surface() is not None:
+                sheet = sheet.convert_alpha()
+            self.sheets.append(sheet)
+
+        self.regions = {name: (self.sheets[region['sheet']], pygame.Rect(region['rect']), region.get('frame'))
+                        for name, region in index_data['regions'].items()}
+        self.frame_cache = {}
+
+    def __contains__(self, name):
+        return name in self.regions
+
+    def names(self):
+        return sorted(self.regions)
+
+    def region(self, name):
+        """图片所在的 (图集, 矩形)"""
+        sheet, rect, frame = self.regions[name]
+        return sheet, rect
+
+    def image(self, name):
+        """整张图片（共享图集像素的子表面）"""
+        sheet, rect = self.region(name)
+        return sheet.subsurface(rect)
+
+    def frames(self, name, frame_width=None, frame_height=None):
+        """
+        横向排列的动画帧列表（共享图集像素的子表面）
+        :param frame_width: 单帧宽度，None 表示使用文件名中的帧尺寸，文件名没有帧尺寸时整张图片就是一帧
+        :param frame_height: 单帧高度，None 表示与图片一样高
+        """
+        key = (name, frame_width, frame_height)
+        frames = self.frame_cache.get(key)
+        if frames is None:
+            sheet, rect, frame = self.regions[name]
+            if frame_width is None:
+                frame_width, default_height = frame if frame else rect.size
+                frame_height = frame_height or default_height
+            frame_height = frame_height or rect.height
+            frames = [sheet.subsurface((rect.x + col * frame_width, rect.y + row * frame_height,
+                                        frame_width, frame_height))
+                      for row in range(rect.height // frame_height)
+                      for col in range(rect.width // frame_width)]
+            self.frame_cache[key] = frames
+        return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把资源包中的图片打包成纹理图集")
+    parser.add_argument("--root", default=ASSET_ROOT, help="资源包所在目录")
+    parser.add_argument("--output", default=ATLAS_DIR, help="图集输出目录")
+    parser.add_argument("--size", type=int, default=ATLAS_SIZE, help="每张图集的最大宽高")
+    args = parser.parse_args()
+
+    pygame.init()
+    index_data = build_atlas(args.root, args.output, size=args.size)
+    print(f"已打包 {len(index_data['regions'])} 张图片到 {len(index_data['sheets'])} 张图集: {args.output}")
+
+
+if __name__ == "__main__":
+    main()